@@ -0,0 +1,217 @@
+from flask import Blueprint, request, jsonify, session, Response, send_file, stream_with_context
+from flask_cors import cross_origin
+from huffman import HuffmanEncoder, HuffmanDecoder, STREAM_BLOCK_SIZE
+from cache import CompressionCache
+from db import DB_DIR
+from history import BlobWriter, blob_path, get_encoding, list_encodings, record_encoding, store_blob
+import codecs
+import io
+import logging
+import os
+import shutil
+import tempfile
+
+api_bp = Blueprint('api', __name__)
+logger = logging.getLogger(__name__)
+
+# Uploads are read and fed to the encoder this many bytes at a time
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# Copies of multipart uploads move from memory to disk past this size
+SPOOL_MAX_SIZE = 1 << 20
+
+# Uploads up to CACHE_MAX_INPUT bytes are read whole and looked up in the
+# result cache; larger ones are always streamed. An empty
+# COMPRESSION_CACHE_DIR turns the on-disk tier off
+CACHE_MAX_INPUT = int(os.environ.get('COMPRESSION_CACHE_MAX_INPUT', 8 << 20))
+compression_cache = CompressionCache(
+    max_bytes=int(os.environ.get('COMPRESSION_CACHE_BYTES', 64 << 20)),
+    disk_dir=os.environ.get('COMPRESSION_CACHE_DIR', os.path.join(DB_DIR, 'cache')) or None,
+    disk_max_bytes=int(os.environ.get('COMPRESSION_CACHE_DISK_BYTES', 1 << 30)),
+)
+
+def _upload_stream():
+    # Multipart uploads carry the data in a 'file' field; anything else is
+    # treated as the raw request body
+    if request.mimetype == 'multipart/form-data':
+        upload = request.files.get('file')
+        if not upload:
+            return None
+        # Werkzeug closes uploaded files when the view returns, before a
+        # streamed response is read, so the generator gets its own copy
+        spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        shutil.copyfileobj(upload.stream, spool, UPLOAD_CHUNK_SIZE)
+        spool.seek(0)
+        return spool
+    return request.stream
+
+def _upload_filename():
+    if request.mimetype == 'multipart/form-data' and 'file' in request.files:
+        return request.files['file'].filename or ''
+    return request.args.get('filename', '')
+
+class _CountingReader:
+    # Counts the upload's bytes as the encoder reads them, for the history entry
+    def __init__(self, stream):
+        self.stream = stream
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = self.stream.read(size)
+        self.bytes_read += len(data)
+        return data
+
+def _read_chunks(stream):
+    while True:
+        chunk = stream.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            return
+        yield chunk
+
+def _drain(buffer):
+    # Hand back what the encoder has written so far and reuse the buffer
+    data = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return data
+
+def _encode_chunks(stream, binary):
+    # Read, encode and yield one upload chunk at a time so memory per request
+    # stays around one block no matter how large the upload is
+    buffer = io.BytesIO()
+    encoder = HuffmanEncoder(buffer, binary=binary)
+    text_decoder = None if binary else codecs.getincrementaldecoder('utf-8')()
+    for chunk in _read_chunks(stream):
+        encoder.feed(chunk if binary else text_decoder.decode(chunk))
+        if buffer.tell():
+            yield _drain(buffer)
+    if text_decoder:
+        encoder.feed(text_decoder.decode(b'', final=True))
+    encoder.finish()
+    yield _drain(buffer)
+
+def _record_history(chunks, source, mode, filename, user_id):
+    # Tee the encoded output into a blob file while it is sent; the history
+    # row is only written once the whole response has been produced
+    blob = BlobWriter()
+    try:
+        for chunk in chunks:
+            blob.write(chunk)
+            yield chunk
+    except BaseException:
+        blob.discard()
+        raise
+    record_encoding(user_id, filename, mode, source.bytes_read, blob.commit(), blob.size)
+
+def _encode_cached(stream, mode):
+    data = stream.read()
+    if stream is not request.stream:
+        stream.close()
+    # The stream format is self-describing, so the cached value carries the
+    # code table along with the payload
+    key = compression_cache.key(data, mode=mode, block_size=STREAM_BLOCK_SIZE)
+    packed = compression_cache.get(key)
+    status = 'HIT'
+    if packed is None:
+        status = 'MISS'
+        try:
+            symbols = data if mode == 'binary' else data.decode('utf-8')
+        except UnicodeDecodeError:
+            return jsonify({"error": "Text mode input must be valid UTF-8"}), 400
+        out = io.BytesIO()
+        encoder = HuffmanEncoder(out, binary=(mode == 'binary'))
+        encoder.feed(symbols)
+        encoder.finish()
+        packed = out.getvalue()
+        compression_cache.put(key, packed)
+    sha, size = store_blob(packed)
+    record_encoding(session['user_id'], _upload_filename(), mode, len(data), sha, size)
+    response = Response(packed, mimetype='application/octet-stream')
+    response.headers['X-Cache'] = status
+    return response
+
+def _decode_chunks(decoder):
+    for block in decoder:
+        yield block if decoder.binary else block.encode('utf-8')
+
+def _stream(chunks, upload):
+    # Once streaming has started the status line is already sent, so a bad
+    # upload can only be logged and the response cut short
+    try:
+        yield from chunks
+    except (ValueError, UnicodeDecodeError) as e:
+        logger.warning(f"Aborted streaming response: {e}")
+        raise
+    finally:
+        if upload is not request.stream:
+            upload.close()
+
+@api_bp.route('/api/encode', methods=['POST'])
+@cross_origin(origins=["http://localhost:5000", "http://127.0.0.1:5500"], supports_credentials=True)
+def encode():
+    if 'user_id' not in session:
+        return jsonify({"error": "Not authenticated"}), 401
+
+    # 'binary' codes raw bytes and works for any file; 'text' codes UTF-8 characters
+    mode = request.args.get('mode', 'binary')
+    if mode not in ('binary', 'text'):
+        return jsonify({"error": "mode must be 'binary' or 'text'"}), 400
+    stream = _upload_stream()
+    if stream is None:
+        return jsonify({"error": "No file provided"}), 400
+
+    if request.content_length is not None and request.content_length <= CACHE_MAX_INPUT:
+        return _encode_cached(stream, mode)
+    source = _CountingReader(stream)
+    chunks = _encode_chunks(source, binary=(mode == 'binary'))
+    chunks = _record_history(chunks, source, mode, _upload_filename(), session['user_id'])
+    return Response(stream_with_context(_stream(chunks, stream)), mimetype='application/octet-stream')
+
+@api_bp.route('/api/decode', methods=['POST'])
+@cross_origin(origins=["http://localhost:5000", "http://127.0.0.1:5500"], supports_credentials=True)
+def decode():
+    if 'user_id' not in session:
+        return jsonify({"error": "Not authenticated"}), 401
+    stream = _upload_stream()
+    if stream is None:
+        return jsonify({"error": "No file provided"}), 400
+
+    # Only the stream header is read here, so a non-Huffman upload is still
+    # rejected with a proper status; blocks are decoded as they are sent
+    try:
+        decoder = HuffmanDecoder(stream)
+    except ValueError as e:
+        logger.info(f"Rejected Huffman stream: {e}")
+        return jsonify({"error": str(e)}), 400
+
+    mimetype = 'application/octet-stream' if decoder.binary else 'text/plain'
+    return Response(stream_with_context(_stream(_decode_chunks(decoder), stream)), mimetype=mimetype)
+
+@api_bp.route('/api/cache-stats', methods=['GET'])
+@cross_origin(origins=["http://localhost:5000", "http://127.0.0.1:5500"], supports_credentials=True)
+def cache_stats():
+    if 'user_id' not in session:
+        return jsonify({"error": "Not authenticated"}), 401
+    return jsonify(compression_cache.stats())
+
+@api_bp.route('/api/encodings', methods=['GET'])
+@cross_origin(origins=["http://localhost:5000", "http://127.0.0.1:5500"], supports_credentials=True)
+def encodings():
+    if 'user_id' not in session:
+        return jsonify({"error": "Not authenticated"}), 401
+    try:
+        limit = int(request.args.get('limit', 20))
+        items, next_cursor = list_encodings(session['user_id'], limit, request.args.get('cursor'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"encodings": items, "next_cursor": next_cursor})
+
+@api_bp.route('/api/encodings/<int:encoding_id>/blob', methods=['GET'])
+@cross_origin(origins=["http://localhost:5000", "http://127.0.0.1:5500"], supports_credentials=True)
+def encoding_blob(encoding_id):
+    if 'user_id' not in session:
+        return jsonify({"error": "Not authenticated"}), 401
+    encoding = get_encoding(session['user_id'], encoding_id)
+    if not encoding:
+        return jsonify({"error": "Not found"}), 404
+    return send_file(blob_path(encoding["blob_sha256"]), mimetype='application/octet-stream',
+                     as_attachment=True, download_name=(encoding["filename"] or 'encoding') + '.huff')
@@ -0,0 +1,112 @@
+from flask import Blueprint, Response, abort, request
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+assets_bp = Blueprint('assets', __name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(BASE_DIR, 'static')
+INDEX_FILE = os.path.join(BASE_DIR, 'index.html')
+
+# Fingerprinted URLs change whenever their content does, so they never need
+# revalidating; the page and unversioned URLs must be checked every time
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+
+# Variants smaller than this are not worth the compression header
+MIN_COMPRESS_SIZE = 256
+
+class Asset:
+    # One file held in memory with its precomputed encodings and a strong
+    # ETag for each, since the variants are different byte sequences
+    def __init__(self, body, content_type, cache_control):
+        self.content_type = content_type
+        self.cache_control = cache_control
+        self.digest = hashlib.sha256(body).hexdigest()
+        self.variants = {'identity': body}
+        if len(body) >= MIN_COMPRESS_SIZE:
+            self.variants['gzip'] = gzip.compress(body, compresslevel=9, mtime=0)
+            if brotli is not None:
+                self.variants['br'] = brotli.compress(body, quality=11)
+
+    def etag(self, encoding):
+        suffix = '' if encoding == 'identity' else '-' + encoding
+        return self.digest[:20] + suffix
+
+    def respond(self):
+        # Prefer the smallest variant the client accepts
+        encoding = 'identity'
+        for candidate in ('br', 'gzip'):
+            if candidate in self.variants and request.accept_encodings[candidate]:
+                encoding = candidate
+                break
+        etag = self.etag(encoding)
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = Response(self.variants[encoding], content_type=self.content_type)
+            if encoding != 'identity':
+                response.headers['Content-Encoding'] = encoding
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = self.cache_control
+        response.headers['Vary'] = 'Accept-Encoding'
+        return response
+
+class AssetStore:
+    def __init__(self):
+        self.assets = {}
+        self.urls = {}
+
+    def load(self):
+        # Built once at startup: fingerprint every file under static/, then
+        # point index.html's references at the fingerprinted names
+        assets = {}
+        urls = {}
+        for root, _, names in os.walk(STATIC_DIR):
+            for name in names:
+                path = os.path.join(root, name)
+                rel = os.path.relpath(path, STATIC_DIR).replace(os.sep, '/')
+                with open(path, 'rb') as f:
+                    body = f.read()
+                content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+                if content_type.startswith('text/') or content_type == 'application/javascript':
+                    content_type += '; charset=utf-8'
+                asset = Asset(body, content_type, REVALIDATE)
+                stem, ext = os.path.splitext(rel)
+                fingerprinted = f"{stem}.{asset.digest[:12]}{ext}"
+                assets[rel] = asset
+                assets[fingerprinted] = Asset(body, content_type, IMMUTABLE)
+                urls[rel] = '/static/' + fingerprinted
+
+        with open(INDEX_FILE, 'rb') as f:
+            page = f.read().decode('utf-8')
+        # index.html links static/... relatively so it also works opened from disk
+        page = re.sub(r'(href|src)="static/([^"]+)"',
+                      lambda m: f'{m.group(1)}="{urls.get(m.group(2), "/static/" + m.group(2))}"', page)
+        assets[''] = Asset(page.encode('utf-8'), 'text/html; charset=utf-8', REVALIDATE)
+        self.assets, self.urls = assets, urls
+
+asset_store = AssetStore()
+
+@assets_bp.record_once
+def load_assets(state):
+    asset_store.load()
+
+@assets_bp.route('/')
+def index():
+    return asset_store.assets[''].respond()
+
+@assets_bp.route('/static/<path:name>')
+def static_file(name):
+    asset = asset_store.assets.get(name)
+    if asset is None or not name:
+        abort(404)
+    return asset.respond()
@@ -1,32 +1,72 @@
-from flask import Blueprint, request, jsonify, session, redirect
+from flask import Blueprint, request, jsonify, session, redirect, current_app
 from google.oauth2.credentials import Credentials
+from google.auth.transport.requests import AuthorizedSession
 from google_auth_oauthlib.flow import Flow
 from googleapiclient.discovery import build
+from requests.adapters import HTTPAdapter
+import httplib2
 import os
 import json
-from datetime import datetime
+import logging
 from flask_cors import cross_origin
+from user_store import upsert_user, user_cache
 
 auth_bp = Blueprint('auth', __name__)
+logger = logging.getLogger(__name__)
 
 # Gmail OAuth2 configuration
 CLIENT_SECRETS_FILE = os.path.join(os.path.dirname(__file__), "client_secrets.json")
 SCOPES = ['https://www.googleapis.com/auth/userinfo.email',
           'https://www.googleapis.com/auth/userinfo.profile',
           'openid']
-
-# Database file path
-DB_FILE = os.path.join(os.path.dirname(__file__), "users.json")
-
-def load_users():
-    if os.path.exists(DB_FILE):
-        with open(DB_FILE, 'r') as f:
-            return json.load(f)
-    return {"users": []}
-
-def save_users(users):
-    with open(DB_FILE, 'w') as f:
-        json.dump(users, f, indent=4)
+REDIRECT_URI = "http://127.0.0.1:5000/api/gmail-callback"
+
+# OAUTH_TOKEN_URI and OAUTH_USERINFO_URI point logins at another server, such
+# as a local stub in tests (plain http also needs OAUTHLIB_INSECURE_TRANSPORT=1)
+OAUTH_TIMEOUT = float(os.environ.get('OAUTH_TIMEOUT', 10))
+
+# One connection pool shared by every login, so the token exchange and the
+# userinfo call reuse kept-alive connections instead of opening new ones.
+# Sessions using it must never be closed, as that would close the pool
+oauth_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=int(os.environ.get('OAUTH_POOL_SIZE', 10)))
+
+def pooled(http):
+    http.mount('https://', oauth_adapter)
+    http.mount('http://', oauth_adapter)
+    return http
+
+@auth_bp.record_once
+def load_oauth_config(state):
+    # Parse client_secrets.json and the bundled oauth2 discovery document once
+    # per app instead of on every login
+    with open(CLIENT_SECRETS_FILE, 'r') as f:
+        client_config = json.load(f)
+    token_uri = os.environ.get('OAUTH_TOKEN_URI')
+    if token_uri:
+        for client in client_config.values():
+            client['token_uri'] = token_uri
+    service = build('oauth2', 'v2', http=httplib2.Http(), cache_discovery=False)
+    state.app.extensions['gmail_oauth'] = {
+        "client_config": client_config,
+        "userinfo_uri": os.environ.get('OAUTH_USERINFO_URI') or service.userinfo().get().uri,
+    }
+
+def fetch_user_info(code):
+    oauth = current_app.extensions['gmail_oauth']
+
+    # A Flow carries per-login state, so it is still created per request, but
+    # from the already parsed config
+    flow = Flow.from_client_config(oauth["client_config"], scopes=SCOPES, redirect_uri=REDIRECT_URI)
+    pooled(flow.oauth2session)
+
+    # Exchange authorization code for credentials
+    flow.fetch_token(code=code, timeout=OAUTH_TIMEOUT)
+
+    # Get user info from Gmail API
+    http = pooled(AuthorizedSession(flow.credentials))
+    response = http.get(oauth["userinfo_uri"], timeout=OAUTH_TIMEOUT)
+    response.raise_for_status()
+    return response.json()
 
 @auth_bp.route('/api/gmail-callback')
 @cross_origin(origins=["http://localhost:5000", "http://127.0.0.1:5500"], supports_credentials=True)
@@ -40,48 +80,15 @@ def gmail_callback():
         if not state:
             return jsonify({"error": "No state parameter provided"}), 400
 
-        # Create flow instance
-        flow = Flow.from_client_secrets_file(
-            CLIENT_SECRETS_FILE,
-            scopes=SCOPES,
-            redirect_uri="http://127.0.0.1:5000/api/gmail-callback"
-        )
-
-        # Exchange authorization code for credentials
-        flow.fetch_token(code=code)
-        credentials = flow.credentials
+        user_info = fetch_user_info(code)
 
-        # Get user info from Gmail API
-        service = build('oauth2', 'v2', credentials=credentials)
-        user_info = service.userinfo().get().execute()
-
-        # Load existing users
-        users = load_users()
-        
-        # Check if user exists
-        user = next((u for u in users["users"] if u["email"] == user_info["email"]), None)
-        
-        if not user:
-            # Create new user
-            user = {
-                "id": len(users["users"]) + 1,
-                "email": user_info["email"],
-                "name": user_info.get("name", ""),
-                "picture": user_info.get("picture", ""),
-                "created_at": datetime.now().isoformat(),
-                "last_login": datetime.now().isoformat()
-            }
-            users["users"].append(user)
-            save_users(users)
-        else:
-            # Update last login
-            user["last_login"] = datetime.now().isoformat()
-            save_users(users)
+        # Create the user or update their profile and last login
+        user = upsert_user(user_info["email"], user_info.get("name", ""), user_info.get("picture", ""))
 
         # Store user info in session
         session['user_id'] = user["id"]
         session['user_email'] = user["email"]
-        print(f"DEBUG: Session after gmail_callback: user_id={session.get('user_id')}, user_email={session.get('user_email')}")
+        logger.debug("Login via gmail_callback", extra={"user_id": user["id"]})
 
         # Return HTML that sends the code back to the opener window
         return f"""
@@ -99,7 +106,7 @@ def gmail_callback():
         """
 
     except Exception as e:
-        print("Error in gmail_callback:", str(e))
+        logger.exception("Error in gmail_callback")
         return jsonify({"error": str(e)}), 500
 
 @auth_bp.route('/api/gmail-login', methods=['POST'])
@@ -110,48 +117,15 @@ def gmail_login():
         if not data or 'code' not in data:
             return jsonify({"error": "No authorization code provided"}), 400
 
-        # Create flow instance
-        flow = Flow.from_client_secrets_file(
-            CLIENT_SECRETS_FILE,
-            scopes=SCOPES,
-            redirect_uri="http://127.0.0.1:5000/api/gmail-callback"
-        )
-
-        # Exchange authorization code for credentials
-        flow.fetch_token(code=data['code'])
-        credentials = flow.credentials
-
-        # Get user info from Gmail API
-        service = build('oauth2', 'v2', credentials=credentials)
-        user_info = service.userinfo().get().execute()
+        user_info = fetch_user_info(data['code'])
 
-        # Load existing users
-        users = load_users()
-        
-        # Check if user exists
-        user = next((u for u in users["users"] if u["email"] == user_info["email"]), None)
-        
-        if not user:
-            # Create new user
-            user = {
-                "id": len(users["users"]) + 1,
-                "email": user_info["email"],
-                "name": user_info.get("name", ""),
-                "picture": user_info.get("picture", ""),
-                "created_at": datetime.now().isoformat(),
-                "last_login": datetime.now().isoformat()
-            }
-            users["users"].append(user)
-            save_users(users)
-        else:
-            # Update last login
-            user["last_login"] = datetime.now().isoformat()
-            save_users(users)
+        # Create the user or update their profile and last login
+        user = upsert_user(user_info["email"], user_info.get("name", ""), user_info.get("picture", ""))
 
         # Store user info in session
         session['user_id'] = user["id"]
         session['user_email'] = user["email"]
-        print(f"DEBUG: Session after gmail_login: user_id={session.get('user_id')}, user_email={session.get('user_email')}")
+        logger.debug("Login via gmail_login", extra={"user_id": user["id"]})
 
         return jsonify({
             "message": "Login successful",
@@ -164,7 +138,7 @@ def gmail_login():
         })
 
     except Exception as e:
-        print("Error in gmail_login:", str(e))
+        logger.exception("Error in gmail_login")
         return jsonify({"error": str(e)}), 500
 
 @auth_bp.route('/api/gmail-logout', methods=['POST'])
@@ -176,10 +150,8 @@ def gmail_logout():
 @auth_bp.route('/api/check-auth', methods=['GET'])
 @cross_origin(origins=["http://localhost:5000", "http://127.0.0.1:5500"], supports_credentials=True)
 def check_auth():
-    print(f"DEBUG: check_auth called. Session has user_id: {'user_id' in session}")
     if 'user_id' in session:
-        users = load_users()
-        user = next((u for u in users["users"] if u["id"] == session['user_id']), None)
+        user = user_cache.get_by_id(session['user_id'])
         if user:
             return jsonify({
                 "is_authenticated": True,
@@ -0,0 +1,268 @@
+import argparse
+import json
+import os
+import platform
+import random
+import string
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import huffman
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+CORPORA = ['uniform', 'zipf', 'skewed', 'english', 'random_bytes']
+DEFAULT_SIZES = '1KB,64KB,1MB,16MB'
+SIZE_UNITS = {'B': 1, 'KB': 1 << 10, 'MB': 1 << 20, 'GB': 1 << 30}
+
+# Corpora are generated as a sample of at most this many symbols and then
+# repeated; Huffman only sees symbol counts, so repetition does not change
+# what is measured, and 1 GB inputs stay quick to build
+SAMPLE_SIZE = 1 << 20
+
+# Stages that expand every bit into a '0'/'1' character are skipped above
+# this size unless --string-stages is given
+STRING_STAGE_LIMIT = 64 << 20
+
+WORDS = ("the of and to in is that it was for on are as with his they at be this from have or by "
+         "one had not but what all were when we there can an your which their said if do will each "
+         "about how up out them then she many some so these would other into has more her two like "
+         "him see time could no make than first been its who now people my made over did down only "
+         "way find use may water long little very after words called just where most know").split()
+
+def parse_size(text):
+    text = text.strip().upper()
+    for unit in sorted(SIZE_UNITS, key=len, reverse=True):
+        if text.endswith(unit):
+            return int(float(text[:-len(unit)]) * SIZE_UNITS[unit])
+    return int(text)
+
+def _zipf_weights(n, s=1.1):
+    return [1 / (rank ** s) for rank in range(1, n + 1)]
+
+def generate_corpus(kind, size, seed=0):
+    rng = random.Random(f"{kind}-{seed}")
+    sample_size = min(size, SAMPLE_SIZE)
+    if kind == 'random_bytes':
+        sample = rng.randbytes(sample_size)
+    elif kind == 'uniform':
+        sample = ''.join(rng.choices(string.printable, k=sample_size))
+    elif kind == 'zipf':
+        alphabet = [chr(c) for c in range(32, 127)] + [chr(c) for c in range(0xa1, 0x180)]
+        sample = ''.join(rng.choices(alphabet, weights=_zipf_weights(len(alphabet)), k=sample_size))
+    elif kind == 'skewed':
+        # Roughly halving weights give a very deep tree with long rare codes
+        alphabet = string.ascii_letters + string.digits
+        sample = ''.join(rng.choices(alphabet, weights=[0.6 ** i for i in range(len(alphabet))], k=sample_size))
+    elif kind == 'english':
+        weights = _zipf_weights(len(WORDS))
+        parts = []
+        length = 0
+        while length < sample_size:
+            word = rng.choices(WORDS, weights=weights)[0]
+            if rng.random() < 0.08:
+                word = word.capitalize()
+            word += rng.choice(' ' * 12 + ',.\n')
+            parts.append(word)
+            length += len(word)
+        sample = ''.join(parts)[:sample_size]
+    else:
+        raise ValueError(f"Unknown corpus: {kind}")
+    repeats, rest = divmod(size, len(sample))
+    # The input size in bytes comes from the sample, so the text corpora are
+    # never encoded whole just to measure them
+    if isinstance(sample, bytes):
+        input_bytes = size
+    else:
+        input_bytes = repeats * _utf8_len(sample) + _utf8_len(sample[:rest])
+    return sample * repeats + sample[:rest], input_bytes
+
+def _utf8_len(text):
+    return len(text.encode('utf-8', 'surrogatepass'))
+
+def _reset_peak_rss():
+    # On Linux, writing 5 to clear_refs resets the VmHWM high-water mark, so
+    # each stage's peak can be measured on its own. Elsewhere ru_maxrss only
+    # ever rises and the figure is the peak so far in the run
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+def _peak_rss_mb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1 << 20 if sys.platform == 'darwin' else 1 << 10), 1)
+
+def _timed(func, *args, repeat=1):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+def run_case(kind, size, seed=0, repeat=1, string_stages=False):
+    data, input_bytes = generate_corpus(kind, size, seed)
+    stages = []
+
+    def record(name, func, *args):
+        per_stage = _reset_peak_rss()
+        result, elapsed = _timed(func, *args, repeat=repeat)
+        stages.append({
+            "stage": name,
+            "seconds": round(elapsed, 6),
+            "mb_per_s": round(input_bytes / (1 << 20) / elapsed, 2) if elapsed else None,
+            # Includes the corpus and earlier stages' results still held
+            "peak_rss_mb": _peak_rss_mb(),
+            "peak_rss_scope": 'stage' if per_stage else 'cumulative',
+        })
+        return result
+
+    freq = record('build_frequency_table', huffman.build_frequency_table, data)
+    root = record('build_huffman_tree', huffman.build_huffman_tree, freq)
+    code_map = record('generate_codes', huffman.generate_codes, root)
+    packed = record('encode_binary', huffman.encode_binary, data, code_map)
+    record('decode_binary', huffman.decode_binary, packed, code_map, isinstance(data, bytes))
+    if isinstance(data, str) and (string_stages or size <= STRING_STAGE_LIMIT):
+        bits = record('encode_text', huffman.encode_text, data, code_map)
+        record('decode_text', huffman.decode_text, bits, code_map)
+        del bits
+
+    return {
+        "corpus": kind,
+        "size": size,
+        "input_bytes": input_bytes,
+        "distinct_symbols": len(freq),
+        "max_code_length": max(map(len, code_map.values()), default=0),
+        "compressed_bytes": len(packed),
+        "compression_ratio": round(len(packed) / input_bytes, 4) if input_bytes else None,
+        "stages": stages,
+    }
+
+def _git_commit():
+    try:
+        result = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5)
+        return result.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def _run_isolated(kind, size, args):
+    # A fresh interpreter per case keeps peak RSS from carrying over
+    cmd = [sys.executable, os.path.abspath(__file__), 'run', '--case', f"{kind}:{size}",
+           '--seed', str(args.seed), '--repeat', str(args.repeat), '--no-isolate']
+    if args.string_stages:
+        cmd.append('--string-stages')
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"{kind}/{size} failed:\n{result.stderr}")
+    return json.loads(result.stdout)["results"][0]
+
+def run(args):
+    if args.case:
+        kind, size = args.case.split(':')
+        cases = [(kind, int(size))]
+    else:
+        cases = [(kind, parse_size(size)) for size in args.sizes.split(',') for kind in args.corpora.split(',')]
+
+    results = []
+    for kind, size in cases:
+        if args.no_isolate:
+            result = run_case(kind, size, args.seed, args.repeat, args.string_stages)
+        else:
+            result = _run_isolated(kind, size, args)
+        results.append(result)
+        if not args.case:
+            total = sum(stage["seconds"] for stage in result["stages"])
+            print(f"{kind:>12} {size:>12} B  ratio {result['compression_ratio']}  {total:.3f}s",
+                  file=sys.stderr)
+
+    report = {
+        "commit": _git_commit(),
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": huffman.np is not None,
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    return 0
+
+def compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    def index(report):
+        return {(r["corpus"], r["size"], s["stage"]): s for r in report["results"] for s in r["stages"]}
+
+    old = index(baseline)
+    regressions = 0
+    for key, stage in sorted(index(current).items()):
+        # Stages this short are mostly timer noise
+        if key not in old or old[key]["seconds"] < args.min_seconds:
+            continue
+        change = stage["seconds"] / old[key]["seconds"] - 1
+        flag = ''
+        if change > args.threshold:
+            flag = '  REGRESSION'
+            regressions += 1
+        print(f"{key[0]:>12} {key[1]:>12} {key[2]:<22} {old[key]['seconds']:>10.4f}s -> "
+              f"{stage['seconds']:>10.4f}s  {change:+.1%}{flag}")
+    return 1 if regressions else 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Huffman engine")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = sub.add_parser('run', help="run benchmarks and emit JSON")
+    run_parser.add_argument('--sizes', default=DEFAULT_SIZES, help="comma-separated sizes, e.g. 1KB,1MB,1GB")
+    run_parser.add_argument('--corpora', default=','.join(CORPORA))
+    run_parser.add_argument('--seed', type=int, default=0)
+    run_parser.add_argument('--repeat', type=int, default=1, help="report the best of N runs per stage")
+    run_parser.add_argument('--string-stages', action='store_true',
+                            help="run encode_text/decode_text even on very large inputs")
+    run_parser.add_argument('--no-isolate', action='store_true',
+                            help="run every case in this process (peak RSS then accumulates)")
+    run_parser.add_argument('--case', help=argparse.SUPPRESS)
+    run_parser.add_argument('--output', '-o')
+
+    compare_parser = sub.add_parser('compare', help="compare two JSON reports stage by stage")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.10,
+                                help="slowdown fraction reported as a regression")
+    compare_parser.add_argument('--min-seconds', type=float, default=0.005,
+                                help="ignore stages that took less than this in the baseline")
+
+    args = parser.parse_args(argv)
+    return run(args) if args.command == 'run' else compare(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
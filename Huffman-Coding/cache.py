@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+class CompressionCache:
+    # Maps a hash of (options, input) to a compressed result. Entries live in
+    # an in-memory LRU capped at max_bytes; with disk_dir set, results are
+    # also written there so they survive restarts and memory eviction
+    def __init__(self, max_bytes=64 << 20, disk_dir=None, disk_max_bytes=1 << 30):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._disk_size = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._disk_size = sum(size for _, size, _ in self._disk_files())
+
+    @staticmethod
+    def key(data, **options):
+        digest = hashlib.sha256(json.dumps(options, sort_keys=True).encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(data)
+        return digest.hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+        value = self._read_disk(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._insert(key, value)
+        return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._insert(key, value)
+        self._write_disk(key, value)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else None,
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "disk_bytes": self._disk_size if self.disk_dir else None,
+            }
+
+    def _insert(self, key, value):
+        # Results larger than the whole budget would only flush everything else
+        if len(value) > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._size -= len(old)
+        self._entries[key] = value
+        self._size += len(value)
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    def _path(self, key):
+        # Two-character fan-out keeps directories small
+        return os.path.join(self.disk_dir, key[:2], key)
+
+    def _read_disk(self, key):
+        if not self.disk_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = f.read()
+            # The modification time doubles as the disk tier's LRU clock
+            os.utime(path)
+        except OSError:
+            return None
+        return value
+
+    def _write_disk(self, key, value):
+        if not self.disk_dir or len(value) > self.disk_max_bytes:
+            return
+        path = self._path(key)
+        if os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary name first so readers never see a partial file
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(value)
+            os.replace(tmp, path)
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return
+        with self._lock:
+            self._disk_size += len(value)
+            over = self._disk_size > self.disk_max_bytes
+        if over:
+            self._trim_disk()
+
+    def _disk_files(self):
+        for root, _, names in os.walk(self.disk_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                yield path, st.st_size, st.st_mtime
+
+    def _trim_disk(self):
+        # Remove least recently used files until the tier is back under 90%
+        # of its budget, so a full cache is not rescanned on every write
+        files = sorted(self._disk_files(), key=lambda f: f[2])
+        size = sum(f[1] for f in files)
+        target = self.disk_max_bytes * 9 // 10
+        for path, file_size, _ in files:
+            if size <= target:
+                break
+            try:
+                os.remove(path)
+                size -= file_size
+            except OSError:
+                pass
+        with self._lock:
+            self._disk_size = size
@@ -0,0 +1,212 @@
+import argparse
+import collections
+import mmap
+import os
+import struct
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from huffman import (
+    LARGE_DECODE_TABLE_BITS,
+    bounded_code_lengths,
+    build_decode_table,
+    build_frequency_table,
+    canonical_codes,
+    check_block_size,
+    decode_packed,
+    deserialize_byte_lengths,
+    deserialize_code_lengths,
+    encode_binary,
+    positive_int,
+    serialize_byte_lengths,
+    serialize_code_lengths,
+)
+
+# Layout (all integers big-endian):
+#   header       magic, version, flags, block size, original length, block count
+#   code lengths one canonical table shared by every block
+#   block table  per block: file offset, compressed size, symbol count, CRC32
+#   blocks       packed payloads, each with its own padding byte
+CONTAINER_MAGIC = b'HUFC'
+CONTAINER_VERSION = 1
+FLAG_BYTES = 0x01
+CONTAINER_BLOCK_SIZE = 1 << 20
+HEADER = struct.Struct('>4sBBIQI')
+BLOCK_ENTRY = struct.Struct('>QIII')
+# Blocks in flight per worker process when packing in parallel
+BLOCKS_PER_WORKER = 2
+
+def _bounded_map(pool, fn, items, window):
+    # Like pool.map, but only `window` items are submitted at once, so a
+    # memory-mapped input is not copied into the pool's queue all up front.
+    # Results come back in input order
+    pending = collections.deque()
+    for item in items:
+        if len(pending) >= window:
+            yield pending.popleft().result()
+        pending.append(pool.submit(fn, item))
+    while pending:
+        yield pending.popleft().result()
+
+def write_container(data, dst, block_size=CONTAINER_BLOCK_SIZE, workers=None):
+    # Every block shares one code table built from the whole input
+    check_block_size(block_size)
+    binary = not isinstance(data, str)
+    freq = build_frequency_table(data)
+    lengths = bounded_code_lengths(freq) if freq else {}
+    codes = canonical_codes(lengths)
+    table = serialize_byte_lengths(lengths) if binary else serialize_code_lengths(lengths)
+
+    block_count = (len(data) + block_size - 1) // block_size
+    blocks = (data[i * block_size:(i + 1) * block_size] for i in range(block_count))
+    dst.write(HEADER.pack(CONTAINER_MAGIC, CONTAINER_VERSION, FLAG_BYTES if binary else 0,
+                          block_size, len(data), block_count))
+    dst.write(table)
+
+    # Payloads are written as they are encoded and the block table, reserved
+    # here, is filled in afterwards, so dst must be seekable
+    table_offset = dst.tell()
+    dst.write(bytes(BLOCK_ENTRY.size * block_count))
+    offset = table_offset + BLOCK_ENTRY.size * block_count
+    entries = []
+    pool = ProcessPoolExecutor(max_workers=workers) if workers and block_count > 1 else None
+    try:
+        if pool:
+            payloads = _bounded_map(pool, partial(encode_binary, code_map=codes), blocks,
+                                    BLOCKS_PER_WORKER * workers)
+        else:
+            payloads = (encode_binary(block, codes) for block in blocks)
+        for index, payload in enumerate(payloads):
+            symbols = min(block_size, len(data) - index * block_size)
+            entries.append(BLOCK_ENTRY.pack(offset, len(payload), symbols, zlib.crc32(payload)))
+            dst.write(payload)
+            offset += len(payload)
+    finally:
+        if pool:
+            pool.shutdown()
+    dst.seek(table_offset)
+    dst.write(b''.join(entries))
+    dst.seek(offset)
+
+class ContainerReader:
+    # Only the header and block table are read up front; blocks are read,
+    # checked against their CRC32 and decoded on demand
+    def __init__(self, src):
+        self.src = src
+        src.seek(0)
+        header = src.read(HEADER.size)
+        if len(header) != HEADER.size:
+            raise ValueError("Truncated container header")
+        magic, version, flags, self.block_size, self.length, block_count = HEADER.unpack(header)
+        if magic != CONTAINER_MAGIC:
+            raise ValueError("Not a Huffman container")
+        if version != CONTAINER_VERSION:
+            raise ValueError(f"Unsupported container version {version}")
+        self.binary = bool(flags & FLAG_BYTES)
+
+        if self.binary:
+            self.lengths = deserialize_byte_lengths(self._read(256))[0]
+        else:
+            count = self._read(4)
+            body = self._read(struct.unpack('>I', count)[0] * 4)
+            self.lengths = deserialize_code_lengths(count + body)[0]
+
+        raw_table = self._read(BLOCK_ENTRY.size * block_count)
+        self.blocks = [BLOCK_ENTRY.unpack_from(raw_table, i * BLOCK_ENTRY.size) for i in range(block_count)]
+        self._decode_table = None
+
+    def __len__(self):
+        return self.length
+
+    def _read(self, size):
+        data = self.src.read(size)
+        if len(data) != size:
+            raise ValueError("Truncated container")
+        return data
+
+    def read_payload(self, index):
+        offset, size, _, crc = self.blocks[index]
+        self.src.seek(offset)
+        payload = self._read(size)
+        if zlib.crc32(payload) != crc:
+            raise ValueError(f"Block {index} failed its CRC32 check")
+        return payload
+
+    def read_block(self, index):
+        if self._decode_table is None:
+            # One table serves every block, so the larger size pays off
+            self._decode_table = build_decode_table(canonical_codes(self.lengths),
+                                                    LARGE_DECODE_TABLE_BITS, self.binary)
+        block = decode_packed(self.read_payload(index), self._decode_table)
+        if len(block) != self.blocks[index][2]:
+            raise ValueError(f"Block {index} decoded to the wrong length")
+        return block
+
+    def read(self, start=0, stop=None):
+        # Decode only the blocks that overlap [start, stop). Negative bounds
+        # are rejected rather than wrapping around to the last block
+        if start < 0 or (stop is not None and stop < 0):
+            raise ValueError(f"Byte range must not be negative, got start={start}, stop={stop}")
+        stop = self.length if stop is None else min(stop, self.length)
+        empty = b'' if self.binary else ''
+        if start >= stop:
+            return empty
+        first = start // self.block_size
+        last = (stop - 1) // self.block_size
+        data = empty.join(self.read_block(i) for i in range(first, last + 1))
+        base = first * self.block_size
+        return data[start - base:stop - base]
+
+    def verify(self):
+        # CRC-check every block without decoding; returns the bad indexes
+        bad = []
+        for index in range(len(self.blocks)):
+            try:
+                self.read_payload(index)
+            except ValueError:
+                bad.append(index)
+        return bad
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pack files into, or read them back from, a Huffman container")
+    parser.add_argument('mode', choices=['pack', 'unpack', 'verify'])
+    parser.add_argument('input')
+    parser.add_argument('output', nargs='?')
+    parser.add_argument('--block-size', type=positive_int, default=CONTAINER_BLOCK_SIZE)
+    parser.add_argument('--workers', type=int, default=None, help="encode blocks in this many processes")
+    parser.add_argument('--start', type=int, default=0, help="first byte to unpack")
+    parser.add_argument('--stop', type=int, default=None, help="unpack up to, not including, this byte")
+    args = parser.parse_args(argv)
+    if args.mode in ('pack', 'unpack') and not args.output:
+        parser.error(f"{args.mode} needs an output path")
+
+    try:
+        if args.mode == 'pack':
+            with open(args.input, 'rb') as src, open(args.output, 'wb') as dst:
+                if not os.fstat(src.fileno()).st_size:
+                    write_container(b'', dst, args.block_size)
+                else:
+                    with mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                        write_container(data, dst, args.block_size, args.workers)
+        elif args.mode == 'unpack':
+            with open(args.input, 'rb') as src:
+                reader = ContainerReader(src)
+                data = reader.read(args.start, args.stop)
+            with open(args.output, 'wb') as dst:
+                dst.write(data if reader.binary else data.encode('utf-8'))
+        else:
+            with open(args.input, 'rb') as src:
+                bad = ContainerReader(src).verify()
+            if bad:
+                print(f"Corrupt blocks: {', '.join(map(str, bad))}", file=sys.stderr)
+                return 1
+            print("All blocks OK")
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,67 @@
+import os
+import sqlite3
+import threading
+
+DB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "database")
+DB_PATH = os.path.join(DB_DIR, "app.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    email TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL DEFAULT '',
+    picture TEXT NOT NULL DEFAULT '',
+    created_at TEXT NOT NULL,
+    last_login TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS encodings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    filename TEXT NOT NULL DEFAULT '',
+    mode TEXT NOT NULL,
+    original_size INTEGER NOT NULL,
+    encoded_size INTEGER NOT NULL,
+    blob_sha256 TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+-- Serves both the per-user filter and the newest-first keyset ordering
+CREATE INDEX IF NOT EXISTS encodings_user_created ON encodings (user_id, created_at, id);
+-- Bumped on every change to users, so processes caching the table can tell
+-- when to reload it without reacting to writes to other tables
+INSERT OR IGNORE INTO meta (key, value) VALUES ('users_version', '0');
+CREATE TRIGGER IF NOT EXISTS users_version_insert AFTER INSERT ON users BEGIN
+    UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'users_version';
+END;
+CREATE TRIGGER IF NOT EXISTS users_version_update AFTER UPDATE ON users BEGIN
+    UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'users_version';
+END;
+CREATE TRIGGER IF NOT EXISTS users_version_delete AFTER DELETE ON users BEGIN
+    UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'users_version';
+END;
+"""
+
+_local = threading.local()
+
+def get_db():
+    # One connection per thread, opened on first use and then reused, so
+    # requests do not pay for connecting and SQLite's thread checks hold
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        os.makedirs(DB_DIR, exist_ok=True)
+        conn = sqlite3.connect(DB_PATH, timeout=10)
+        conn.row_factory = sqlite3.Row
+        # WAL lets readers run alongside the single writer
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        _local.conn = conn
+    return conn
+
+def init_db():
+    conn = get_db()
+    conn.executescript(SCHEMA)
+    conn.commit()
@@ -0,0 +1,31 @@
+# gunicorn -c gunicorn.conf.py wsgi:app
+#
+# Every setting can be overridden from the environment:
+#   BIND              address to listen on (default 127.0.0.1:5000)
+#   WEB_CONCURRENCY   worker processes (default 2 x CPUs + 1)
+#   WORKER_THREADS    threads per gthread worker (default 4)
+#   WORKER_CLASS      gthread (default) or gevent for many slow clients
+#   WORKER_CONNECTIONS  concurrent clients per gevent worker (default 1000)
+#   TIMEOUT           seconds a silent worker may take before it is restarted
+#   GRACEFUL_TIMEOUT  seconds in-flight requests get to finish on shutdown
+import multiprocessing
+import os
+
+bind = os.environ.get('BIND', '127.0.0.1:5000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.environ.get('WORKER_CLASS', 'gthread')
+threads = int(os.environ.get('WORKER_THREADS', 4))
+worker_connections = int(os.environ.get('WORKER_CONNECTIONS', 1000))
+
+# Large uploads are streamed through the encoder, so allow long requests
+timeout = int(os.environ.get('TIMEOUT', 120))
+graceful_timeout = int(os.environ.get('GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('KEEPALIVE', 5))
+
+# Each worker imports the app itself so no SQLite connection is shared
+# across a fork
+preload_app = False
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.environ.get('LOG_LEVEL', 'info').lower()
@@ -0,0 +1,97 @@
+import base64
+import hashlib
+import os
+import tempfile
+from datetime import datetime
+
+from db import DB_DIR, get_db
+
+# Encoded outputs are stored once per distinct content, named by SHA-256
+BLOB_DIR = os.path.join(DB_DIR, "blobs")
+MAX_PAGE_SIZE = 100
+
+class BlobWriter:
+    # Streams data to a temporary file while hashing it; commit() moves it to
+    # its content address, or drops it if identical content is already stored
+    def __init__(self):
+        os.makedirs(BLOB_DIR, exist_ok=True)
+        fd, self._tmp = tempfile.mkstemp(dir=BLOB_DIR)
+        self._file = os.fdopen(fd, 'wb')
+        self._hash = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data):
+        self._file.write(data)
+        self._hash.update(data)
+        self.size += len(data)
+
+    def commit(self):
+        self._file.close()
+        sha = self._hash.hexdigest()
+        path = blob_path(sha)
+        if os.path.exists(path):
+            os.remove(self._tmp)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(self._tmp, path)
+        return sha
+
+    def discard(self):
+        self._file.close()
+        if os.path.exists(self._tmp):
+            os.remove(self._tmp)
+
+def blob_path(sha):
+    return os.path.join(BLOB_DIR, sha[:2], sha)
+
+def store_blob(data):
+    # The data is already in memory, so hash it first and skip the write
+    # when the same output is stored, as it is for every cache hit
+    sha = hashlib.sha256(data).hexdigest()
+    if os.path.exists(blob_path(sha)):
+        return sha, len(data)
+    writer = BlobWriter()
+    writer.write(data)
+    return writer.commit(), writer.size
+
+def record_encoding(user_id, filename, mode, original_size, sha, encoded_size):
+    conn = get_db()
+    with conn:
+        cur = conn.execute(
+            """INSERT INTO encodings (user_id, filename, mode, original_size, encoded_size, blob_sha256, created_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            (user_id, filename, mode, original_size, encoded_size, sha, datetime.now().isoformat()),
+        )
+    return cur.lastrowid
+
+def _encode_cursor(row):
+    return base64.urlsafe_b64encode(f"{row['created_at']}|{row['id']}".encode()).decode()
+
+def _decode_cursor(cursor):
+    try:
+        created_at, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().rsplit('|', 1)
+        return created_at, int(row_id)
+    except (ValueError, UnicodeError):
+        raise ValueError("Invalid cursor")
+
+def list_encodings(user_id, limit=20, cursor=None):
+    # Keyset pagination: each page continues strictly after the last
+    # (created_at, id) seen, so the index is walked from that point and no
+    # earlier rows are skipped over. Blobs are never read
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    query = """SELECT id, filename, mode, original_size, encoded_size, blob_sha256, created_at
+               FROM encodings WHERE user_id = ?"""
+    params = [user_id]
+    if cursor:
+        query += " AND (created_at, id) < (?, ?)"
+        params.extend(_decode_cursor(cursor))
+    query += " ORDER BY created_at DESC, id DESC LIMIT ?"
+    params.append(limit + 1)
+    rows = get_db().execute(query, params).fetchall()
+    next_cursor = _encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return [dict(row) for row in rows[:limit]], next_cursor
+
+def get_encoding(user_id, encoding_id):
+    row = get_db().execute("SELECT * FROM encodings WHERE id = ? AND user_id = ?",
+                           (encoding_id, user_id)).fetchone()
+    return dict(row) if row else None
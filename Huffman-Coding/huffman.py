@@ -1,8 +1,59 @@
+import argparse
 import heapq
+from array import array
 import json
-from collections import defaultdict
+import struct
+import sys
+import mmap
+import os
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Number of characters encoded per step by encode_binary
+PACK_CHUNK_SIZE = 1 << 16
+
+# Inputs shorter than this stay on the pure Python path even with NumPy
+NUMPY_MIN_SIZE = 1 << 14
+
+# Bits resolved per decode-table lookup; longer codes take a slower path.
+# Large inputs use a bigger table, since its build cost is paid only once.
+DECODE_TABLE_BITS = 12
+LARGE_DECODE_TABLE_BITS = 16
+LARGE_DECODE_THRESHOLD = 1 << 23
+
+# Code trees with more internal nodes than this are decoded with the bit
+# table only; the byte-indexed state table would have 256 entries per node
+STATE_TABLE_MAX_STATES = 512
+# Building the state table costs about as much as decoding this many payload
+# bytes per node with the bit table, so smaller payloads skip it
+STATE_TABLE_BYTES_PER_STATE = 2048
+
+# Longest code compress() and the stream encoder will emit
+MAX_CODE_LENGTH = 15
+
+# Streaming container: magic, flags byte, optional global code-length table,
+# then (symbol count, payload size) framed blocks ending with a (0, 0) frame
+STREAM_MAGIC = b'HUFS'
+FLAG_GLOBAL_TABLE = 0x01
+FLAG_BYTES = 0x02
+STREAM_BLOCK_SIZE = 1 << 20
+FRAME_HEADER = struct.Struct('>II')
+
+# Parallel container: magic, flags byte, block count, (offset, size) per
+# block, then the blocks themselves, each one independently produced by
+# compress(), or compress_bytes() when FLAG_BYTES is set
+PARALLEL_MAGIC = b'HUFP'
+PARALLEL_HEADER = struct.Struct('>4sBI')
+BLOCK_INDEX_ENTRY = struct.Struct('>QI')
 
 class Node:
+    __slots__ = ('char', 'freq', 'left', 'right')
+
     def __init__(self, char=None, freq=None):
         self.char = char  
         self.freq = freq
@@ -12,49 +63,739 @@ class Node:
     def __lt__(self, other):
         return self.freq < other.freq
 
-def build_frequency_table(text):
+def _use_numpy(text, use_numpy):
+    if np is None or use_numpy is False:
+        return False
+    return use_numpy or len(text) >= NUMPY_MIN_SIZE
+
+def _code_points(text):
+    # Text becomes an array of code points; bytes-like input is viewed as-is
+    if isinstance(text, str):
+        return np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype='<u4')
+    return np.frombuffer(text, dtype=np.uint8)
+
+def _symbol_value(char):
+    return ord(char) if isinstance(char, str) else char
+
+def _numpy_frequency_table(text):
+    counts = np.bincount(_code_points(text).astype(np.intp))
+    freq = defaultdict(int)
+    for point in np.flatnonzero(counts).tolist():
+        freq[chr(point)] = int(counts[point])
+    return freq
+
+def build_byte_frequency_table(data, use_numpy=None):
+    # Fixed 256-entry count list for bytes, bytearray, memoryview or mmap input
+    if _use_numpy(data, use_numpy):
+        return np.bincount(np.frombuffer(data, dtype=np.uint8).astype(np.intp), minlength=256).tolist()
+    counts = Counter(memoryview(data).cast('B'))
+    return [counts.get(byte, 0) for byte in range(256)]
+
+def build_frequency_table(text, use_numpy=None):
+    if not isinstance(text, str):
+        counts = build_byte_frequency_table(text, use_numpy)
+        return defaultdict(int, ((byte, count) for byte, count in enumerate(counts) if count))
+    if _use_numpy(text, use_numpy):
+        return _numpy_frequency_table(text)
     freq = defaultdict(int)
     for char in text:
         freq[char] += 1
     return freq
 
 def build_huffman_tree(freq_table):
-    heap = [Node(char, freq) for char, freq in freq_table.items()]
+    # Ties on frequency break on symbol order for leaves and creation order
+    # for merged nodes, so equal counts always give the same tree
+    heap = [(freq, i, Node(char, freq)) for i, (char, freq) in enumerate(sorted(freq_table.items()))]
     heapq.heapify(heap)
+    order = len(heap)
 
     while len(heap) > 1:
-        n1 = heapq.heappop(heap)
-        n2 = heapq.heappop(heap)
-        merged = Node(freq=n1.freq + n2.freq)
+        f1, _, n1 = heapq.heappop(heap)
+        f2, _, n2 = heapq.heappop(heap)
+        merged = Node(freq=f1 + f2)
         merged.left = n1
         merged.right = n2
-        heapq.heappush(heap, merged)
+        heapq.heappush(heap, (merged.freq, order, merged))
+        order += 1
+
+    return heap[0][2] if heap else None
+
+def build_flat_tree(freq_table):
+    # Leaves are 0..n-1 in symbol order; merged node n + i has children
+    # left[i] and right[i], and the last merged node is the root
+    symbols = sorted(freq_table)
+    heap = [(freq_table[char], i) for i, char in enumerate(symbols)]
+    heapq.heapify(heap)
+    left = array('i')
+    right = array('i')
+    next_index = len(symbols)
+
+    while len(heap) > 1:
+        f1, i1 = heapq.heappop(heap)
+        f2, i2 = heapq.heappop(heap)
+        left.append(i1)
+        right.append(i2)
+        heapq.heappush(heap, (f1 + f2, next_index))
+        next_index += 1
+
+    return symbols, left, right
 
-    return heap[0] if heap else None
+def flat_code_lengths(symbols, left, right):
+    if len(symbols) == 1:
+        return {symbols[0]: 1}
+    # Merged nodes are created after their children, so walking them from
+    # the root backwards sets every parent's depth before its children
+    n = len(symbols)
+    depth = array('i', bytes(4 * (n + len(left))))
+    for i in range(len(left) - 1, -1, -1):
+        child_depth = depth[n + i] + 1
+        depth[left[i]] = child_depth
+        depth[right[i]] = child_depth
+    return {char: depth[i] for i, char in enumerate(symbols)}
 
 def generate_codes(root):
     codes = {}
+    if root is None:
+        return codes
+    # A single-symbol tree still needs a one-bit code
+    if root.char is not None:
+        codes[root.char] = "0"
+        return codes
+
+    # Walk with an explicit stack, carrying each code as an int plus its
+    # length and only formatting the bit string once a leaf is reached
+    stack = [(root, 0, 0)]
+    while stack:
+        node, value, length = stack.pop()
+        if node.char is not None:
+            codes[node.char] = format(value, '0%db' % length)
+            continue
+        if node.right:
+            stack.append((node.right, (value << 1) | 1, length + 1))
+        if node.left:
+            stack.append((node.left, value << 1, length + 1))
+    return codes
+
+def _package_merge_lengths(freq_table, max_length):
+    symbols = sorted(freq_table, key=lambda char: (freq_table[char], char))
+    n = len(symbols)
+    if (1 << max_length) < n:
+        raise ValueError(f"{n} symbols do not fit in {max_length}-bit codes")
+    if n <= 2:
+        return {char: 1 for char in symbols}
 
-    def traverse(node, current_code):
-        if node:
-            if node.char is not None:
-                codes[node.char] = current_code
-            traverse(node.left, current_code + "0")
-            traverse(node.right, current_code + "1")
+    # Leaves are (weight, index) and packages are (weight, item, item); each
+    # round pairs up the cheapest items and merges the pairs back with leaves
+    leaves = [(freq_table[char], i) for i, char in enumerate(symbols)]
+    items = leaves
+    for _ in range(max_length - 1):
+        packages = [(items[j][0] + items[j + 1][0], items[j], items[j + 1])
+                    for j in range(0, len(items) - 1, 2)]
+        items = list(heapq.merge(leaves, packages, key=lambda item: item[0]))
 
-    traverse(root, "")
+    # A symbol's code length is how often it occurs in the cheapest 2n - 2 items
+    lengths = [0] * n
+    stack = items[:2 * n - 2]
+    while stack:
+        item = stack.pop()
+        if len(item) == 2:
+            lengths[item[1]] += 1
+        else:
+            stack.append(item[1])
+            stack.append(item[2])
+    return {char: lengths[i] for i, char in enumerate(symbols)}
+
+def code_lengths(freq_table, max_length=None):
+    lengths = flat_code_lengths(*build_flat_tree(freq_table))
+    if max_length is not None and lengths and max(lengths.values()) > max_length:
+        lengths = _package_merge_lengths(freq_table, max_length)
+    return lengths
+
+def bounded_code_lengths(freq_table):
+    # Cap code lengths when the alphabet allows it, so decode tables of
+    # LARGE_DECODE_TABLE_BITS resolve every code in a single lookup
+    if len(freq_table) <= 1 << MAX_CODE_LENGTH:
+        return code_lengths(freq_table, MAX_CODE_LENGTH)
+    return code_lengths(freq_table)
+
+def canonical_codes(lengths):
+    # Codes are handed out in (length, symbol) order, so the lengths alone
+    # are enough to rebuild the same code map on the decoding side
+    codes = {}
+    code = 0
+    prev_length = 0
+    for char, length in sorted(lengths.items(), key=lambda item: (item[1], item[0])):
+        code <<= length - prev_length
+        codes[char] = format(code, '0%db' % length)
+        code += 1
+        prev_length = length
     return codes
 
+def serialize_code_lengths(lengths):
+    # Symbol count, then a 3-byte code point and 1-byte length per symbol
+    out = bytearray(struct.pack('>I', len(lengths)))
+    for char, length in sorted(lengths.items()):
+        out += ord(char).to_bytes(3, 'big')
+        out.append(length)
+    return bytes(out)
+
+def deserialize_code_lengths(data, offset=0):
+    (count,) = struct.unpack_from('>I', data, offset)
+    offset += 4
+    if len(data) < offset + count * 4:
+        raise ValueError("Truncated code length table")
+    lengths = {}
+    for _ in range(count):
+        char = chr(int.from_bytes(data[offset:offset + 3], 'big'))
+        lengths[char] = data[offset + 3]
+        offset += 4
+    return lengths, offset
+
+def serialize_byte_lengths(lengths):
+    # Byte alphabets always use a fixed 256-byte table, zero for unused bytes
+    return bytes(lengths.get(byte, 0) for byte in range(256))
+
+def deserialize_byte_lengths(data, offset=0):
+    if len(data) < offset + 256:
+        raise ValueError("Truncated code length table")
+    lengths = {byte: data[offset + byte] for byte in range(256) if data[offset + byte]}
+    return lengths, offset + 256
+
+def compress(text):
+    lengths = bounded_code_lengths(build_frequency_table(text))
+    return serialize_code_lengths(lengths) + encode_binary(text, canonical_codes(lengths))
+
+def decompress(data):
+    lengths, offset = deserialize_code_lengths(data)
+    return decode_binary(memoryview(data)[offset:], canonical_codes(lengths))
+
+def compress_bytes(data):
+    lengths = bounded_code_lengths(build_frequency_table(data))
+    return serialize_byte_lengths(lengths) + encode_binary(data, canonical_codes(lengths))
+
+def decompress_bytes(data):
+    lengths, offset = deserialize_byte_lengths(data)
+    return decode_binary(memoryview(data)[offset:], canonical_codes(lengths), binary=True)
+
+def compress_file(path):
+    # Map the file instead of reading it, so large inputs are not copied
+    with open(path, 'rb') as f:
+        if not os.fstat(f.fileno()).st_size:
+            return compress_bytes(b'')
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return compress_bytes(data)
+
 def encode_text(text, code_map):
     return ''.join(code_map[char] for char in text)
 
+def pack_bits(bits):
+    # The first byte records how many zero bits pad out the last byte
+    padding = (8 - len(bits) % 8) % 8
+    bits += '0' * padding
+    payload = int(bits, 2).to_bytes(len(bits) // 8, 'big') if bits else b''
+    return bytes([padding]) + payload
+
+def unpack_bits(data):
+    payload = data[1:]
+    if not payload:
+        return ''
+    padding = data[0]
+    bits = bin(int.from_bytes(payload, 'big'))[2:].zfill(len(payload) * 8)
+    return bits[:len(bits) - padding]
+
+def _numpy_encode_binary(text, code_map, chunk_size):
+    symbols = list(code_map)
+    table_points = np.array([_symbol_value(char) for char in symbols], dtype=np.intp)
+    table_values = np.array([int(code_map[char], 2) for char in symbols], dtype=np.uint64)
+    table_lengths = np.array([len(code_map[char]) for char in symbols], dtype=np.int64)
+    lookup = np.full(int(table_points.max()) + 1 if symbols else 1, -1, dtype=np.intp)
+    lookup[table_points] = np.arange(len(symbols))
+    # Bytes a single code can touch once shifted by up to 7 bits
+    span = (int(table_lengths.max()) + 14) // 8 if symbols else 0
+
+    out = [b'']
+    carry_bits = 0
+    carry_byte = 0
+    points = _code_points(text)
+    for start in range(0, len(points), chunk_size):
+        chunk = points[start:start + chunk_size].astype(np.intp)
+        index = lookup[np.minimum(chunk, len(lookup) - 1)]
+        missing = (index < 0) | (chunk >= len(lookup))
+        if missing.any():
+            point = int(chunk[missing.argmax()])
+            raise KeyError(chr(point) if isinstance(text, str) else point)
+
+        # Left-align every code in a 64-bit window starting at the byte its
+        # first bit lands in, then add each window byte into place. Codes
+        # never overlap, so adding the bytes is the same as OR-ing them.
+        lengths = table_lengths[index]
+        ends = np.cumsum(lengths) + carry_bits
+        starts = ends - lengths
+        windows = table_values[index] << (64 - (starts & 7) - lengths).astype(np.uint64)
+        first_byte = starts >> 3
+        total_bits = int(ends[-1])
+        size = (total_bits + 7) // 8
+        packed = np.zeros(size, dtype=np.float64)
+        for k in range(span):
+            window_byte = ((windows >> np.uint64(56 - 8 * k)) & np.uint64(0xFF)).astype(np.float64)
+            packed += np.bincount(first_byte + k, weights=window_byte, minlength=size + span)[:size]
+        packed = packed.astype(np.uint8)
+        packed[0] |= carry_byte
+
+        whole = total_bits // 8
+        out.append(packed[:whole].tobytes())
+        carry_bits = total_bits % 8
+        carry_byte = int(packed[whole]) if carry_bits else 0
+    if carry_bits:
+        out.append(bytes([carry_byte]))
+    out[0] = bytes([(8 - carry_bits) % 8])
+    return b''.join(out)
+
+def encode_binary(text, code_map, chunk_size=PACK_CHUNK_SIZE, use_numpy=None):
+    # Shifted codes must fit a 64-bit window for the NumPy packer
+    if _use_numpy(text, use_numpy) and max(map(len, code_map.values()), default=0) <= 57:
+        return _numpy_encode_binary(text, code_map, chunk_size)
+    if isinstance(text, str):
+        lookup = code_map.__getitem__
+    else:
+        # Bytes index a flat 256-entry list rather than hashing into a dict
+        byte_codes = [code_map.get(byte) for byte in range(256)]
+        lookup = byte_codes.__getitem__
+    out = bytearray(1)
+    carry = ''
+    # Pack a chunk at a time so the '0'/'1' string never holds the whole input
+    for start in range(0, len(text), chunk_size):
+        bits = carry + ''.join(map(lookup, text[start:start + chunk_size]))
+        whole = len(bits) - len(bits) % 8
+        if whole:
+            out += int(bits[:whole], 2).to_bytes(whole // 8, 'big')
+        carry = bits[whole:]
+    if carry:
+        out[0] = 8 - len(carry)
+        out.append(int(carry.ljust(8, '0'), 2))
+    return bytes(out)
+
+def build_decode_table(code_map, table_bits=DECODE_TABLE_BITS, binary=False):
+    join = bytes if binary else ''.join
+    max_len = max((len(code) for code in code_map.values()), default=0)
+    bits = min(max_len, table_bits)
+    # Every index whose leading bits match a code maps to (symbol, length)
+    single = [None] * (1 << bits)
+    long_codes = {}
+    for symbol, code in code_map.items():
+        length = len(code)
+        if length > bits:
+            long_codes[(length, int(code, 2))] = join([symbol])
+            continue
+        first = int(code, 2) << (bits - length)
+        entry = (symbol, length)
+        for index in range(first, first + (1 << (bits - length))):
+            single[index] = entry
+
+    # Extend each entry with every further whole code that fits in the same
+    # bits, so one lookup can emit several symbols at once
+    mask = (1 << bits) - 1
+    table = [None] * (1 << bits)
+    for index, entry in enumerate(single):
+        if entry is None:
+            continue
+        symbols = []
+        used = 0
+        while entry is not None and used + entry[1] <= bits:
+            symbols.append(entry[0])
+            used += entry[1]
+            entry = single[(index << used) & mask]
+        table[index] = (join(symbols), used)
+    single = [None if entry is None else (join([entry[0]]), entry[1]) for entry in single]
+    # The byte-indexed state table is built on first use by a payload large
+    # enough to pay for it, then kept here for later blocks
+    states = [_code_trie(code_map), None]
+    return table, single, bits, long_codes, max_len, states, binary
+
+def _code_trie(code_map):
+    # Internal nodes of the code tree as [child for 0, child for 1]; a child
+    # is a node index or a (symbol,) leaf. Node 0 is the root
+    nodes = [[None, None]]
+    for symbol, code in code_map.items():
+        node = 0
+        for bit in code[:-1]:
+            child = nodes[node][bit == '1']
+            if child is None:
+                child = len(nodes)
+                nodes.append([None, None])
+                nodes[node][bit == '1'] = child
+            node = child
+        if code:
+            nodes[node][code[-1] == '1'] = (symbol,)
+    return nodes
+
+def _walk_bits(nodes, state, value, count, symbols):
+    # Follow `count` bits of value, most significant first, from state;
+    # returns the state reached, or None on a bit sequence no code starts with
+    for shift in range(count - 1, -1, -1):
+        child = nodes[state][(value >> shift) & 1]
+        if child is None:
+            return None
+        if type(child) is tuple:
+            symbols.append(child[0])
+            state = 0
+        else:
+            state = child
+    return state
+
+def _build_state_table(nodes, binary=False):
+    # rows[state][byte] = (symbols emitted, row of the next state), so the
+    # decoder does one lookup per input byte and no bit arithmetic at all.
+    # Each row is composed from two 16-entry nibble steps, which keeps the
+    # build at one join per entry. Invalid bytes map to None
+    join = bytes if binary else ''.join
+    nibbles = []
+    for state in range(len(nodes)):
+        row = []
+        for value in range(16):
+            symbols = []
+            end = _walk_bits(nodes, state, value, 4, symbols)
+            row.append(None if end is None else (join(symbols), end))
+        nibbles.append(row)
+    rows = [[None] * 256 for _ in nodes]
+    for state, row in enumerate(rows):
+        for high, first in enumerate(nibbles[state]):
+            if first is None:
+                continue
+            head, middle = first
+            for low, second in enumerate(nibbles[middle]):
+                if second is not None:
+                    row[(high << 4) | low] = (head + second[0], rows[second[1]])
+    return rows, {id(row): state for state, row in enumerate(rows)}
+
+def _decode_states(payload, bit_count, nodes, state_table, binary):
+    rows, state_of = state_table
+    whole, tail = divmod(bit_count, 8)
+    # bytes iterate faster than a memoryview, and bytearray.extend beats
+    # joining many small bytes objects
+    out = bytearray() if binary else []
+    append = out.extend if binary else out.append
+    row = rows[0]
+    try:
+        for byte in bytes(payload[:whole]):
+            symbols, row = row[byte]
+            append(symbols)
+    except TypeError:
+        raise ValueError("Encoded data contains an invalid code") from None
+    if tail:
+        # The last byte's padding is not data, so its bits are walked singly
+        symbols = []
+        if _walk_bits(nodes, state_of[id(row)], payload[whole] >> (8 - tail), tail, symbols) is None:
+            raise ValueError("Encoded data contains an invalid code")
+        append((bytes if binary else ''.join)(symbols))
+    return bytes(out) if binary else ''.join(out)
+
+def _decode_packed(payload, bit_count, decode_table):
+    table, single, bits, long_codes, max_len, states, binary = decode_table
+    if not bit_count:
+        return b'' if binary else ''
+    if not max_len:
+        raise ValueError("Encoded data contains an invalid code")
+    nodes, state_table = states
+    if (state_table is None and len(nodes) <= STATE_TABLE_MAX_STATES
+            and len(payload) >= len(nodes) * STATE_TABLE_BYTES_PER_STATE):
+        state_table = states[1] = _build_state_table(nodes, binary)
+    if state_table is not None:
+        return _decode_states(payload, bit_count, nodes, state_table, binary)
+    return _decode_bits(payload, bit_count, decode_table)
+
+def _decode_bits(payload, bit_count, decode_table):
+    # Bit-buffer decoder for small payloads and very large code trees
+    table, single, bits, long_codes, max_len, states, binary = decode_table
+    mask = (1 << bits) - 1
+    # bytes.join is slow over many small pieces, so bytes go to a bytearray
+    out = bytearray() if binary else []
+    append = out.extend if binary else out.append
+    acc = 0
+    have = 0
+    pos = 0
+    end = len(payload)
+    remaining = bit_count
+    while remaining >= bits:
+        if have < max_len and pos < end:
+            # Stale bits above `have` are only dropped on refill
+            chunk = payload[pos:pos + 8]
+            acc = ((acc & ((1 << have) - 1)) << (len(chunk) * 8)) | int.from_bytes(chunk, 'big')
+            have += len(chunk) * 8
+            pos += len(chunk)
+            while have < max_len and pos < end:
+                acc = (acc << 8) | payload[pos]
+                have += 8
+                pos += 1
+        entry = table[(acc >> (have - bits)) & mask]
+        if entry is None:
+            entry = _decode_long_code(acc & ((1 << have) - 1), have, bits, long_codes, max_len)
+        append(entry[0])
+        have -= entry[1]
+        remaining -= entry[1]
+    acc &= (1 << have) - 1
+
+    # Fewer than table_bits bits left: finish one symbol at a time
+    while remaining > 0:
+        while have < max_len and pos < end:
+            acc = (acc << 8) | payload[pos]
+            have += 8
+            pos += 1
+        if have >= bits:
+            entry = single[(acc >> (have - bits)) & mask]
+        else:
+            entry = single[(acc << (bits - have)) & mask]
+        if entry is None:
+            entry = _decode_long_code(acc, have, bits, long_codes, max_len)
+        if entry[1] > remaining:
+            break
+        append(entry[0])
+        have -= entry[1]
+        remaining -= entry[1]
+        acc &= (1 << have) - 1
+    return bytes(out) if binary else ''.join(out)
+
+def _decode_long_code(acc, have, bits, long_codes, max_len):
+    for length in range(bits + 1, max_len + 1):
+        if have >= length:
+            value = acc >> (have - length)
+        else:
+            value = (acc << (length - have)) & ((1 << length) - 1)
+        symbol = long_codes.get((length, value))
+        if symbol is not None:
+            return symbol, length
+    raise ValueError("Encoded data contains an invalid code")
+
+def _table_bits_for(bit_count):
+    if bit_count >= LARGE_DECODE_THRESHOLD:
+        return LARGE_DECODE_TABLE_BITS
+    return DECODE_TABLE_BITS
+
+def decode_packed(data, decode_table):
+    # Decode packed output with a table from build_decode_table, so callers
+    # decoding many blocks with one code map only build the table once
+    data = memoryview(data)
+    if len(data) < 2:
+        return b'' if decode_table[-1] else ''
+    bit_count = (len(data) - 1) * 8 - data[0]
+    return _decode_packed(data[1:], bit_count, decode_table)
+
+def decode_binary(data, code_map, binary=False):
+    bit_count = max(len(data) - 1, 0) * 8
+    return decode_packed(data, build_decode_table(code_map, _table_bits_for(bit_count), binary))
+
 def decode_text(encoded_text, code_map):
-    reverse_map = {v: k for k, v in code_map.items()}
-    current = ''
-    decoded = ''
-    for bit in encoded_text:
-        current += bit
-        if current in reverse_map:
-            decoded += reverse_map[current]
-            current = ''
-    return decoded 
\ No newline at end of file
+    packed = pack_bits(encoded_text)
+    decode_table = build_decode_table(code_map, _table_bits_for(len(encoded_text)))
+    return _decode_packed(packed[1:], len(encoded_text), decode_table)
+
+def compress_parallel(text, block_size=STREAM_BLOCK_SIZE, workers=None):
+    # Accepts str, or bytes-like data for the byte-oriented mode
+    binary = not isinstance(text, str)
+    blocks = [text[start:start + block_size] for start in range(0, len(text), block_size)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        encoded = list(pool.map(compress_bytes if binary else compress, blocks))
+
+    index = bytearray(PARALLEL_HEADER.pack(PARALLEL_MAGIC, FLAG_BYTES if binary else 0, len(encoded)))
+    offset = 0
+    for block in encoded:
+        index += BLOCK_INDEX_ENTRY.pack(offset, len(block))
+        offset += len(block)
+    return bytes(index) + b''.join(encoded)
+
+def read_block_index(data):
+    # Returns whether the blocks hold bytes, and their (offset, size) spans
+    if bytes(data[:len(PARALLEL_MAGIC)]) != PARALLEL_MAGIC:
+        raise ValueError("Not a parallel Huffman container")
+    if len(data) < PARALLEL_HEADER.size:
+        raise ValueError("Truncated block index")
+    _, flags, count = PARALLEL_HEADER.unpack_from(data)
+    start = PARALLEL_HEADER.size + count * BLOCK_INDEX_ENTRY.size
+    if len(data) < start:
+        raise ValueError("Truncated block index")
+    blocks = []
+    for i in range(count):
+        offset, size = BLOCK_INDEX_ENTRY.unpack_from(data, PARALLEL_HEADER.size + i * BLOCK_INDEX_ENTRY.size)
+        if start + offset + size > len(data):
+            raise ValueError("Truncated Huffman block")
+        blocks.append((start + offset, size))
+    return bool(flags & FLAG_BYTES), blocks
+
+def decompress_parallel(data, workers=None):
+    binary, spans = read_block_index(data)
+    blocks = [bytes(data[offset:offset + size]) for offset, size in spans]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        if binary:
+            return b''.join(pool.map(decompress_bytes, blocks))
+        return ''.join(pool.map(decompress, blocks))
+
+def _read_exact(src, size):
+    data = src.read(size)
+    if len(data) != size:
+        raise ValueError("Truncated Huffman stream")
+    return data
+
+def _read_code_lengths(src, binary=False):
+    if binary:
+        return deserialize_byte_lengths(_read_exact(src, 256))[0]
+    count = _read_exact(src, 4)
+    body = _read_exact(src, struct.unpack('>I', count)[0] * 4)
+    return deserialize_code_lengths(count + body)[0]
+
+def check_block_size(block_size):
+    # A block size below one would write no blocks, or empty frames forever
+    if block_size < 1:
+        raise ValueError(f"Block size must be at least 1, got {block_size}")
+    return block_size
+
+def positive_int(text):
+    # argparse type for block sizes and similar counts
+    try:
+        return check_block_size(int(text))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {text!r}")
+
+class HuffmanEncoder:
+    def __init__(self, out, block_size=STREAM_BLOCK_SIZE, lengths=None, binary=False):
+        check_block_size(block_size)
+        self.out = out
+        self.block_size = block_size
+        self.lengths = lengths
+        self.binary = binary
+        self._empty = b'' if binary else ''
+        self._serialize = serialize_byte_lengths if binary else serialize_code_lengths
+        self._codes = canonical_codes(lengths) if lengths else None
+        self._pending = []
+        self._pending_size = 0
+
+        # With a global table every block shares one header; otherwise each
+        # block carries its own code lengths
+        flags = (FLAG_GLOBAL_TABLE if lengths else 0) | (FLAG_BYTES if binary else 0)
+        out.write(STREAM_MAGIC + bytes([flags]))
+        if lengths:
+            out.write(self._serialize(lengths))
+
+    def feed(self, chunk):
+        self._pending.append(chunk)
+        self._pending_size += len(chunk)
+        if self._pending_size < self.block_size:
+            return
+        data = self._empty.join(self._pending)
+        start = 0
+        while len(data) - start >= self.block_size:
+            self._write_block(data[start:start + self.block_size])
+            start += self.block_size
+        rest = data[start:]
+        self._pending = [rest] if rest else []
+        self._pending_size = len(rest)
+
+    def finish(self):
+        if self._pending_size:
+            self._write_block(self._empty.join(self._pending))
+        self._pending = []
+        self._pending_size = 0
+        self.out.write(FRAME_HEADER.pack(0, 0))
+
+    def _write_block(self, block):
+        header = b''
+        codes = self._codes
+        if codes is None:
+            lengths = bounded_code_lengths(build_frequency_table(block))
+            header = self._serialize(lengths)
+            codes = canonical_codes(lengths)
+        payload = encode_binary(block, codes)
+        self.out.write(FRAME_HEADER.pack(len(block), len(payload)) + header)
+        self.out.write(payload)
+
+class HuffmanDecoder:
+    def __init__(self, src):
+        self.src = src
+        magic = _read_exact(src, len(STREAM_MAGIC) + 1)
+        if magic[:len(STREAM_MAGIC)] != STREAM_MAGIC:
+            raise ValueError("Not a Huffman stream")
+        self.binary = bool(magic[-1] & FLAG_BYTES)
+        self.lengths = None
+        self._decode_table = None
+        if magic[-1] & FLAG_GLOBAL_TABLE:
+            self.lengths = _read_code_lengths(src, self.binary)
+            self._decode_table = build_decode_table(canonical_codes(self.lengths), binary=self.binary)
+
+    def __iter__(self):
+        while True:
+            symbol_count, payload_size = FRAME_HEADER.unpack(_read_exact(self.src, FRAME_HEADER.size))
+            if not symbol_count and not payload_size:
+                return
+            decode_table = self._decode_table
+            if decode_table is None:
+                lengths = _read_code_lengths(self.src, self.binary)
+                decode_table = build_decode_table(canonical_codes(lengths), binary=self.binary)
+            block = decode_packed(_read_exact(self.src, payload_size), decode_table)
+            if len(block) != symbol_count:
+                raise ValueError("Huffman block decoded to the wrong length")
+            yield block
+
+def _read_chunks(src, size):
+    while True:
+        chunk = src.read(size)
+        if not chunk:
+            return
+        yield chunk
+
+def compress_stream(src, dst, block_size=STREAM_BLOCK_SIZE, global_table=False, binary=False):
+    check_block_size(block_size)
+    lengths = None
+    if global_table:
+        # First pass: count over the whole input, then rewind and encode
+        freq = defaultdict(int)
+        for chunk in _read_chunks(src, block_size):
+            for char, count in build_frequency_table(chunk).items():
+                freq[char] += count
+        src.seek(0)
+        lengths = bounded_code_lengths(freq) if freq else None
+    encoder = HuffmanEncoder(dst, block_size, lengths, binary)
+    for chunk in _read_chunks(src, block_size):
+        encoder.feed(chunk)
+    encoder.finish()
+
+def decompress_stream(src, dst):
+    for block in HuffmanDecoder(src):
+        dst.write(block)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compress or decompress a file with Huffman coding")
+    parser.add_argument('mode', choices=['compress', 'decompress'])
+    parser.add_argument('input')
+    parser.add_argument('output')
+    parser.add_argument('--block-size', type=positive_int, default=STREAM_BLOCK_SIZE,
+                        help="characters (or bytes) per independently coded block")
+    parser.add_argument('--global-table', action='store_true',
+                        help="make a first pass and share one code table across blocks")
+    parser.add_argument('--binary', action='store_true',
+                        help="compress raw bytes instead of UTF-8 text")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.mode == 'compress':
+            if args.binary:
+                src = open(args.input, 'rb')
+            else:
+                src = open(args.input, 'r', encoding='utf-8', newline='')
+            with src, open(args.output, 'wb') as dst:
+                compress_stream(src, dst, args.block_size, args.global_table, args.binary)
+        else:
+            with open(args.input, 'rb') as src:
+                decoder = HuffmanDecoder(src)
+                if decoder.binary:
+                    dst = open(args.output, 'wb')
+                else:
+                    dst = open(args.output, 'w', encoding='utf-8', newline='')
+                with dst:
+                    for block in decoder:
+                        dst.write(block)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
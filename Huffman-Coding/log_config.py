@@ -0,0 +1,107 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from flask import g, has_request_context, request
+
+# LOG_LEVEL       minimum level written (default INFO)
+# LOG_FORMAT      json (default) or text
+# LOG_SAMPLE_RATE fraction of DEBUG records kept when DEBUG is enabled (default 0.1)
+
+# Attributes every LogRecord has; anything else was passed through extra=
+_RECORD_FIELDS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class RequestContextFilter(logging.Filter):
+    # Runs on the request thread, before the record is queued, so the id of
+    # the request that logged it is still available
+    def filter(self, record):
+        if not hasattr(record, 'request_id'):
+            record.request_id = g.get('request_id') if has_request_context() else None
+        return True
+
+class SamplingFilter(logging.Filter):
+    # Keeps only a fraction of records at or below max_level; warnings and
+    # errors always pass
+    def __init__(self, rate, max_level=logging.DEBUG):
+        super().__init__()
+        self.rate = rate
+        self.max_level = max_level
+
+    def filter(self, record):
+        return record.levelno > self.max_level or random.random() < self.rate
+
+_listener = None
+
+def configure_logging(app=None):
+    # Request threads only put records on a queue; a background listener
+    # thread does the formatting and writing
+    global _listener
+    if _listener is None:
+        level = os.environ.get('LOG_LEVEL', 'INFO').upper()
+        text = os.environ.get('LOG_FORMAT', 'json') == 'text'
+
+        output = logging.StreamHandler(sys.stderr)
+        output.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s')
+                            if text else JsonFormatter())
+
+        log_queue = queue.SimpleQueue()
+        handler = QueueHandler(log_queue)
+        handler.addFilter(SamplingFilter(float(os.environ.get('LOG_SAMPLE_RATE', 0.1))))
+        handler.addFilter(RequestContextFilter())
+        # The queue handler's prepare() would flatten the record into a
+        # string; keep it intact for the listener's formatter
+        handler.prepare = _prepare
+
+        root = logging.getLogger()
+        root.handlers[:] = [handler]
+        root.setLevel(level)
+
+        _listener = QueueListener(log_queue, output, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+
+    if app is not None:
+        app.before_request(_assign_request_id)
+        app.after_request(_echo_request_id)
+
+def _prepare(record):
+    # Resolve the message and traceback now, since args and exc_info may not
+    # survive until the listener formats the record
+    record.msg = record.getMessage()
+    record.args = None
+    if record.exc_info:
+        record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+    return record
+
+def _assign_request_id():
+    # Reuse an id set by a proxy in front of the app so logs can be joined
+    g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex[:16]
+
+def _echo_request_id(response):
+    response.headers['X-Request-ID'] = g.get('request_id', '')
+    return response
@@ -1,15 +1,50 @@
 from flask import Flask, jsonify
 from flask_cors import CORS
 from auth import auth_bp
+from api import api_bp
+from assets import assets_bp
+from db import DB_DIR, init_db
+from user_store import migrate_users_json, user_cache
+from log_config import configure_logging
 import os
 import logging
+import tempfile
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-app = Flask(__name__)
-app.secret_key = os.urandom(24)  # Required for session management
+SECRET_KEY_FILE = os.path.join(DB_DIR, 'secret_key')
+
+def load_secret_key():
+    # Every worker process must sign sessions with the same key, so it comes
+    # from SECRET_KEY or a file created once and then shared
+    if os.environ.get('SECRET_KEY'):
+        return os.environ['SECRET_KEY']
+    os.makedirs(DB_DIR, exist_ok=True)
+    if not os.path.exists(SECRET_KEY_FILE):
+        # The key is written to a private temporary file and then linked into
+        # place, so the file is never seen empty. Linking fails if the name
+        # exists, so exactly one of several starting workers publishes its key
+        fd, tmp = tempfile.mkstemp(dir=DB_DIR)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(os.urandom(32))
+            os.link(tmp, SECRET_KEY_FILE)
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(tmp)
+    with open(SECRET_KEY_FILE, 'rb') as f:
+        key = f.read()
+    if not key:
+        raise RuntimeError(f"{SECRET_KEY_FILE} is empty; delete it or set SECRET_KEY")
+    return key
+
+# index.html and static/ are served by assets_bp, not Flask's static route
+app = Flask(__name__, static_folder=None)
+app.secret_key = load_secret_key()  # Required for session management
+
+# Structured, queued logging with a request id on every record
+configure_logging(app)
 
 # Flask Session Cookie Configuration for local development
 app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
@@ -24,12 +59,20 @@ logger.info(f"Configured CORS origins: {CORS_ORIGINS}")
 
 # Register blueprints
 app.register_blueprint(auth_bp)
+app.register_blueprint(api_bp)
+app.register_blueprint(assets_bp)
 
 # Create database directory if it doesn't exist
-os.makedirs('database', exist_ok=True)
+os.makedirs(DB_DIR, exist_ok=True)
+
+# Create the SQLite schema, import users.json on first run and load the
+# in-memory user index used by check_auth
+init_db()
+migrate_users_json()
+user_cache.load()
 
-@app.route('/')
-def home():
+@app.route('/api/health')
+def health():
     return jsonify({"status": "Server is running"})
 
 @app.errorhandler(404)
@@ -43,7 +86,8 @@ def server_error(error):
 if __name__ == '__main__':
     try:
         logger.info("Starting server on http://127.0.0.1:5000")
-        app.run(host='127.0.0.1', port=5000, debug=True)
+        # Development server only; production runs wsgi:app under gunicorn
+        app.run(host='127.0.0.1', port=5000, debug=os.environ.get('FLASK_DEBUG', '1') == '1')
     except Exception as e:
         logger.error(f"Failed to start server: {str(e)}")
         raise 
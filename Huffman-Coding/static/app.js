@@ -0,0 +1,405 @@
+function toggleTheme() {
+  const html = document.documentElement;
+  const themeIcon = document.getElementById('themeIcon');
+  const themeText = document.getElementById('themeText');
+  if (html.getAttribute('data-theme') === 'light') {
+    html.setAttribute('data-theme', 'dark');
+    themeIcon.textContent = '🌙';
+    themeText.textContent = 'Light Mode';
+  } else {
+    html.setAttribute('data-theme', 'light');
+    themeIcon.textContent = '🌞';
+    themeText.textContent = 'Dark Mode';
+  }
+}
+
+function showSection(section) {
+  document.querySelectorAll('.section').forEach(sec => sec.classList.remove('active'));
+  document.querySelectorAll('.nav-btn').forEach(btn => btn.classList.remove('active'));
+  document.getElementById('section-' + section).classList.add('active');
+  if (section === 'text') document.querySelector('.nav-btn').classList.add('active');
+  else if (section === 'encode') document.querySelectorAll('.nav-btn')[1].classList.add('active');
+  else if (section === 'decode') document.querySelectorAll('.nav-btn')[2].classList.add('active');
+}
+
+function showAlert(msg) {
+  console.log('Showing alert:', msg);
+  const alertBox = document.createElement("div");
+  alertBox.textContent = msg;
+  alertBox.style.position = "fixed";
+  alertBox.style.bottom = "20px";
+  alertBox.style.left = "50%";
+  alertBox.style.transform = "translateX(-50%)";
+  alertBox.style.background = msg.includes('successful') ? "#4CAF50" : "#f44336";
+  alertBox.style.color = "white";
+  alertBox.style.padding = "10px 20px";
+  alertBox.style.borderRadius = "6px";
+  alertBox.style.zIndex = "9999";
+  alertBox.style.fontSize = "14px";
+  alertBox.style.fontWeight = "bold";
+  document.body.appendChild(alertBox);
+  setTimeout(() => alertBox.remove(), 5000);
+}
+
+function showContactsModal() {
+  document.getElementById('contactsModalBg').style.display = 'flex';
+}
+
+function hideContactsModal() {
+  document.getElementById('contactsModalBg').style.display = 'none';
+}
+
+// Huffman Node class
+class HuffmanNode {
+  constructor(char, freq) {
+    this.char = char;
+    this.freq = freq;
+    this.left = null;
+    this.right = null;
+  }
+}
+
+// Function to build frequency map
+function buildFrequencyMap(text) {
+  const freqMap = new Map();
+  for (let char of text) {
+    freqMap.set(char, (freqMap.get(char) || 0) + 1);
+  }
+  return freqMap;
+}
+
+// Function to build Huffman tree
+function buildHuffmanTree(freqMap) {
+  const nodes = [];
+  for (let [char, freq] of freqMap) {
+    nodes.push(new HuffmanNode(char, freq));
+  }
+
+  while (nodes.length > 1) {
+    nodes.sort((a, b) => a.freq - b.freq);
+    const left = nodes.shift();
+    const right = nodes.shift();
+    const parent = new HuffmanNode(null, left.freq + right.freq);
+    parent.left = left;
+    parent.right = right;
+    nodes.push(parent);
+  }
+
+  return nodes[0];
+}
+
+// Function to generate Huffman codes
+function generateHuffmanCodes(root, code = '', codes = new Map()) {
+  if (!root) return codes;
+
+  if (!root.left && !root.right) {
+    codes.set(root.char, code || '0');
+  }
+
+  generateHuffmanCodes(root.left, code + '0', codes);
+  generateHuffmanCodes(root.right, code + '1', codes);
+
+  return codes;
+}
+
+// Function to encode text using Huffman codes
+function encodeText(text, codes) {
+  let encoded = '';
+  for (let char of text) {
+    encoded += codes.get(char);
+  }
+  return encoded;
+}
+
+function handleTextEncode() {
+  const text = document.getElementById('inputText').value.trim();
+  if (!text) {
+    showAlert("Please enter some text to encode.");
+    return;
+  }
+
+  try {
+    // Build frequency map
+    const freqMap = buildFrequencyMap(text);
+
+    // Build Huffman tree
+    const root = buildHuffmanTree(freqMap);
+
+    // Generate Huffman codes
+    const codes = generateHuffmanCodes(root);
+
+    // Encode the text
+    const encodedText = encodeText(text, codes);
+
+    // Display results
+    document.getElementById('encodedText').value = encodedText;
+    document.getElementById('inputCodeMap').value = JSON.stringify(Object.fromEntries(codes), null, 2);
+
+    showAlert("Text encoded successfully!");
+  } catch (error) {
+    console.error('Encoding error:', error);
+    showAlert("Encoding failed: " + error.message);
+  }
+}
+
+function handleTextDecode() {
+  const encodedText = document.getElementById('inputEncodedText').value.trim();
+  const codeMapInput = document.getElementById('inputCodeMapInput').value.trim();
+
+  if (!encodedText || !codeMapInput) {
+    showAlert("Please provide both encoded string and code map.");
+    return;
+  }
+
+  try {
+    // Parse the code map
+    const codeMap = JSON.parse(codeMapInput);
+
+    // Create reverse mapping
+    const reverseMap = new Map();
+    for (let [char, code] of Object.entries(codeMap)) {
+      reverseMap.set(code, char);
+    }
+
+    // Decode the text
+    let decodedText = '';
+    let currentCode = '';
+
+    for (let bit of encodedText) {
+      currentCode += bit;
+      if (reverseMap.has(currentCode)) {
+        decodedText += reverseMap.get(currentCode);
+        currentCode = '';
+      }
+    }
+
+    // Display result
+    document.getElementById('decodedText').value = decodedText;
+    showAlert("Text decoded successfully!");
+  } catch (error) {
+    console.error('Decoding error:', error);
+    showAlert("Decoding failed: " + error.message);
+  }
+}
+
+// Files are sent to the server, which compresses them with the Python
+// engine; the code table travels inside the .huff file
+async function postFile(endpoint, file) {
+  const response = await fetch(`http://127.0.0.1:5000/api/${endpoint}?filename=${encodeURIComponent(file.name)}`, {
+    method: 'POST',
+    credentials: 'include',
+    headers: { 'Content-Type': 'application/octet-stream' },
+    body: file
+  });
+  if (!response.ok) {
+    let message = response.statusText;
+    try {
+      message = (await response.json()).error || message;
+    } catch (e) {}
+    throw new Error(message);
+  }
+  return response.blob();
+}
+
+async function handleEncodeFile() {
+  const file = document.getElementById('fileInput').files[0];
+
+  if (!file) {
+    showAlert("Please select a file to encode.");
+    return;
+  }
+
+  try {
+    const encodedBlob = await postFile('encode', file);
+
+    const encodedDownloadLink = document.getElementById('encodedDownloadLink');
+    encodedDownloadLink.href = URL.createObjectURL(encodedBlob);
+    encodedDownloadLink.download = file.name + '.huff'; // Suggest a .huff extension
+    encodedDownloadLink.style.display = 'block';
+    encodedDownloadLink.textContent = `Download Encoded ${file.name}.huff`;
+
+    showAlert("File encoded successfully! Download link is available below.");
+  } catch (error) {
+    console.error('File encoding error:', error);
+    showAlert("File encoding failed: " + error.message);
+  }
+}
+
+async function handleDecodeFile() {
+  const encodedFile = document.getElementById('encodedFile').files[0];
+
+  if (!encodedFile) {
+    showAlert("Please select an encoded file.");
+    return;
+  }
+
+  try {
+    const decodedBlob = await postFile('decode', encodedFile);
+
+    const decodeDownloadLink = document.getElementById('decodeDownloadLink');
+    decodeDownloadLink.href = URL.createObjectURL(decodedBlob);
+    decodeDownloadLink.download = encodedFile.name.endsWith('.huff')
+      ? encodedFile.name.slice(0, -'.huff'.length)
+      : encodedFile.name + '_decoded';
+    decodeDownloadLink.style.display = 'block';
+    decodeDownloadLink.textContent = `Download Decoded File`;
+
+    showAlert("File decoded successfully! Download link is available below.");
+  } catch (error) {
+    console.error('File decoding error:', error);
+    showAlert("File decoding failed: " + error.message);
+  }
+}
+
+// Gmail OAuth2 configuration
+const GMAIL_CLIENT_ID = '199958017372-5is0djvi7q8tr2ure8e5id1532j0m84m.apps.googleusercontent.com';
+const GMAIL_REDIRECT_URI = 'http://127.0.0.1:5000/api/gmail-callback';
+
+function initGmailLogin() {
+  console.log('Initializing Gmail login...');
+
+  // Create Google OAuth URL with state parameter for security
+  const state = Math.random().toString(36).substring(7);
+  localStorage.setItem('oauth_state', state);
+
+  const authUrl = `https://accounts.google.com/o/oauth2/v2/auth?` +
+    `client_id=${encodeURIComponent(GMAIL_CLIENT_ID)}` +
+    `&redirect_uri=${encodeURIComponent(GMAIL_REDIRECT_URI)}` +
+    `&response_type=code` +
+    `&scope=${encodeURIComponent('https://www.googleapis.com/auth/userinfo.email https://www.googleapis.com/auth/userinfo.profile openid')}` +
+    `&access_type=offline` +
+    `&state=${state}` +
+    `&prompt=consent`;
+
+  console.log('Opening auth URL:', authUrl);
+
+  // Open Google OAuth in a new window
+  const width = 500;
+  const height = 600;
+  const left = (window.innerWidth - width) / 2;
+  const top = (window.innerHeight - height) / 2;
+
+  const popup = window.open(
+    authUrl,
+    'Gmail Login',
+    `width=${width},height=${height},left=${left},top=${top}`
+  );
+
+  if (!popup) {
+    showAlert('Please allow popups for this website');
+    return;
+  }
+
+  // Listen for the OAuth response
+  window.addEventListener('message', async (event) => {
+    if (event.origin === 'http://127.0.0.1:5000' && event.data.code) {
+      try {
+        // Verify state parameter
+        const savedState = localStorage.getItem('oauth_state');
+        if (event.data.state !== savedState) {
+          throw new Error('Invalid state parameter');
+        }
+        localStorage.removeItem('oauth_state');
+
+        console.log('Received auth code, sending to server...');
+        const response = await fetch('http://127.0.0.1:5000/api/gmail-login', {
+          method: 'POST',
+          headers: {
+            'Content-Type': 'application/json'
+          },
+          credentials: 'include',
+          body: JSON.stringify({ 
+            code: event.data.code,
+            state: event.data.state
+          })
+        });
+
+        const data = await response.json();
+        console.log('Login response:', data);
+
+        if (response.ok) {
+          localStorage.setItem('user', JSON.stringify(data.user));
+          document.getElementById('loginOverlay').style.display = 'none';
+          showAlert('Login successful!');
+          updateUserInterface(data.user);
+        } else {
+          throw new Error(data.error || 'Login failed');
+        }
+      } catch (error) {
+        console.error('Gmail login error:', error);
+        showAlert('Login failed: ' + (error.message || 'Unknown error'));
+      }
+    }
+  });
+}
+
+function updateUserInterface(user) {
+  console.log('updateUserInterface called with user:', user);
+  const userInfo = document.getElementById('userInfo');
+  const userEmail = document.getElementById('userEmail');
+  const logoutBtn = document.getElementById('logoutBtn');
+
+  if (user) {
+    userInfo.style.display = 'flex';
+    userEmail.textContent = user.email;
+    logoutBtn.style.display = 'inline-block';
+    console.log('User logged in. userInfo display:', userInfo.style.display, 'logoutBtn display:', logoutBtn.style.display);
+  } else {
+    userInfo.style.display = 'none';
+    userEmail.textContent = '';
+    logoutBtn.style.display = 'none';
+    console.log('User logged out. userInfo display:', userInfo.style.display, 'logoutBtn display:', logoutBtn.style.display);
+  }
+}
+
+async function handleLogout() {
+  try {
+    const response = await fetch('http://127.0.0.1:5000/api/gmail-logout', {
+      method: 'POST',
+      credentials: 'include'
+    });
+
+    if (response.ok) {
+      localStorage.removeItem('user');
+      document.getElementById('loginOverlay').style.display = 'flex';
+      updateUserInterface(null);
+      showAlert('Logged out successfully');
+    }
+  } catch (error) {
+    console.error('Logout error:', error);
+    showAlert('Logout failed: ' + error.message);
+  }
+}
+
+async function checkAuth() {
+  console.log('checkAuth called.');
+  try {
+    const response = await fetch('http://127.0.0.1:5000/api/check-auth', {
+      credentials: 'include'
+    });
+    const data = await response.json();
+    console.log('checkAuth response:', data);
+
+    if (data.is_authenticated) {
+      localStorage.setItem('user', JSON.stringify(data.user));
+      document.getElementById('loginOverlay').style.display = 'none';
+      console.log('loginOverlay display set to none in checkAuth.');
+      updateUserInterface(data.user);
+    } else {
+      document.getElementById('loginOverlay').style.display = 'flex';
+      console.log('loginOverlay display set to flex in checkAuth.');
+      updateUserInterface(null);
+    }
+  } catch (error) {
+    console.error('Auth check error:', error);
+    document.getElementById('loginOverlay').style.display = 'flex';
+    console.log('loginOverlay display set to flex in checkAuth (error case).');
+    updateUserInterface(null);
+  }
+}
+
+// Remove the old Gmail API loading code
+window.onload = function() {
+  console.log('Page loaded');
+  checkAuth();
+};
@@ -0,0 +1,145 @@
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+from db import get_db
+
+logger = logging.getLogger(__name__)
+
+USERS_JSON = os.path.join(os.path.dirname(os.path.abspath(__file__)), "users.json")
+
+# How often, in seconds, the cache checks whether another process has
+# changed the users table
+RELOAD_CHECK_INTERVAL = 1.0
+
+def users_version():
+    # Counter bumped by triggers on every change to users (see db.SCHEMA)
+    row = get_db().execute("SELECT value FROM meta WHERE key = 'users_version'").fetchone()
+    return int(row[0]) if row else 0
+
+class UserCache:
+    # All users indexed by id and email in memory, so check_auth is a dict
+    # lookup. Logins in this process write through; writes from other
+    # processes are picked up when the users_version counter changes, so
+    # writes to other tables, such as encode history, never cause a reload
+    def __init__(self):
+        self._by_id = {}
+        self._by_email = {}
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def load(self):
+        with self._lock:
+            # Read the version first so a write racing the read triggers a reload
+            version = users_version()
+            users = [dict(row) for row in get_db().execute("SELECT * FROM users")]
+            # Swap in whole new dicts so readers never see a half-built index
+            self._by_id = {user["id"]: user for user in users}
+            self._by_email = {user["email"]: user for user in users}
+            self._version = version
+            self._checked_at = time.monotonic()
+
+    def _refresh(self):
+        now = time.monotonic()
+        if self._version is not None and now - self._checked_at < RELOAD_CHECK_INTERVAL:
+            return
+        self._checked_at = now
+        if users_version() != self._version:
+            self.load()
+
+    def get_by_id(self, user_id):
+        self._refresh()
+        user = self._by_id.get(user_id)
+        if user is None:
+            # Written by another process since the last check
+            user = get_user_by_id(user_id)
+            if user is not None:
+                self.put(user)
+        return user
+
+    def get_by_email(self, email):
+        self._refresh()
+        user = self._by_email.get(email)
+        if user is None:
+            user = get_user_by_email(email)
+            if user is not None:
+                self.put(user)
+        return user
+
+    def put(self, user, version=None):
+        # version is users_version right after this process wrote the user.
+        # If it is exactly one past ours, no other process wrote in between
+        # and the cache stays current; otherwise the next check reloads
+        with self._lock:
+            by_id = dict(self._by_id)
+            by_email = dict(self._by_email)
+            by_id[user["id"]] = user
+            by_email[user["email"]] = user
+            self._by_id, self._by_email = by_id, by_email
+            if version is not None and self._version is not None and version == self._version + 1:
+                self._version = version
+
+user_cache = UserCache()
+
+def _row_to_user(row):
+    return dict(row) if row else None
+
+def get_user_by_id(user_id):
+    row = get_db().execute("SELECT * FROM users WHERE id = ?", (user_id,)).fetchone()
+    return _row_to_user(row)
+
+def get_user_by_email(email):
+    row = get_db().execute("SELECT * FROM users WHERE email = ?", (email,)).fetchone()
+    return _row_to_user(row)
+
+def upsert_user(email, name="", picture=""):
+    # Creates the user on first login and otherwise refreshes the profile and
+    # last_login; the UNIQUE email index makes this one atomic statement
+    now = datetime.now().isoformat()
+    conn = get_db()
+    with conn:
+        conn.execute(
+            """INSERT INTO users (email, name, picture, created_at, last_login)
+               VALUES (?, ?, ?, ?, ?)
+               ON CONFLICT(email) DO UPDATE SET
+                   name = excluded.name,
+                   picture = excluded.picture,
+                   last_login = excluded.last_login""",
+            (email, name, picture, now, now),
+        )
+        # Read inside the write transaction, so the version counts exactly
+        # the writes up to and including this one
+        user = get_user_by_email(email)
+        version = users_version()
+    user_cache.put(user, version)
+    return user
+
+def migrate_users_json(path=USERS_JSON):
+    # One-time import of the old users.json; ids are kept so existing
+    # sessions stay valid. A flag in meta stops it from running again
+    conn = get_db()
+    if conn.execute("SELECT 1 FROM meta WHERE key = 'users_json_migrated'").fetchone():
+        return 0
+    users = []
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            users = json.load(f).get("users", [])
+    with conn:
+        for user in users:
+            conn.execute(
+                """INSERT OR IGNORE INTO users (id, email, name, picture, created_at, last_login)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                (user["id"], user["email"], user.get("name", ""), user.get("picture", ""),
+                 user.get("created_at", datetime.now().isoformat()),
+                 user.get("last_login", user.get("created_at", datetime.now().isoformat()))),
+            )
+        # OR IGNORE because several workers may start and migrate at once
+        conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('users_json_migrated', ?)",
+                     (datetime.now().isoformat(),))
+    if users:
+        logger.info(f"Migrated {len(users)} users from {path}")
+    return len(users)
@@ -0,0 +1,4 @@
+# Production entry point: gunicorn -c gunicorn.conf.py wsgi:app
+from server import app
+
+application = app
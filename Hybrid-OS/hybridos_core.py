@@ -3,9 +3,13 @@ import os
 import subprocess
 import platform
 import shutil
+import tempfile
 import datetime
 import getpass
 from pathlib import Path
+from hybridos_exec import run_command
+import hybridos_native as native
+from hybridos_utils import cap_lines, count_file, grep_lines, head_lines, read_capped, sorted_lines, tail_lines
 
 class HybridOS:
     def __init__(self):
@@ -224,10 +228,14 @@ class HybridOS:
         try:
             if platform.system() == "Windows":
                 cmd = "dir" + (" " + args if args else "")
-                result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+                result = run_command(cmd)
             else:
+                # Native listing unless ls-only flags are used
+                output = native.ls(args if args else "-la")
+                if output is not None:
+                    return output
                 cmd = "ls" + (" " + args if args else " -la")
-                result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+                result = run_command(cmd)
             return result.stdout + result.stderr
         except Exception as e:
             return f"Error: {e}"
@@ -304,8 +312,7 @@ class HybridOS:
             return "Usage: cat <filename>"
         try:
             path = self._normalize_path(args)
-            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-                return f.read()
+            return read_capped(path)
         except FileNotFoundError:
             return f"Error: File not found: {args}"
         except Exception as e:
@@ -363,9 +370,7 @@ class HybridOS:
             parts = args.split()
             filename = self._normalize_path(parts[0])
             n_lines = int(parts[1]) if len(parts) > 1 else 10
-            with open(filename, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = f.readlines()[:n_lines]
-                return ''.join(lines)
+            return head_lines(filename, n_lines)
         except Exception as e:
             return f"Error: {e}"
 
@@ -376,9 +381,7 @@ class HybridOS:
             parts = args.split()
             filename = self._normalize_path(parts[0])
             n_lines = int(parts[1]) if len(parts) > 1 else 10
-            with open(filename, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = f.readlines()[-n_lines:]
-                return ''.join(lines)
+            return tail_lines(filename, n_lines)
         except Exception as e:
             return f"Error: {e}"
 
@@ -387,12 +390,8 @@ class HybridOS:
             return "Usage: wc <filename>"
         try:
             filename = self._normalize_path(args)
-            with open(filename, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-                lines = content.count('\n')
-                words = len(content.split())
-                chars = len(content)
-                return f"{lines} lines, {words} words, {chars} characters"
+            lines, words, chars = count_file(filename)
+            return f"{lines} lines, {words} words, {chars} characters"
         except Exception as e:
             return f"Error: {e}"
 
@@ -400,10 +399,40 @@ class HybridOS:
         if not args:
             return "Usage: sort <filename>"
         try:
-            filename = self._normalize_path(args)
-            with open(filename, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = f.readlines()
-                return ''.join(sorted(lines))
+            # As in sort(1), '-o <file>' before or after the input writes the
+            # full result to that file instead of returning it
+            parts = args.split()
+            source, output = args, None
+            if len(parts) > 2 and parts[0] == "-o":
+                output, source = parts[1], " ".join(parts[2:])
+            elif len(parts) > 2 and parts[-2] == "-o":
+                output, source = parts[-1], " ".join(parts[:-2])
+            filename = self._normalize_path(source)
+            if output is not None:
+                output = self._normalize_path(output)
+                # Written beside the target and moved into place, so the
+                # output may safely be the input file itself
+                fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(output)))
+                count = 0
+                try:
+                    with os.fdopen(fd, 'w', encoding='utf-8') as out:
+                        for line in sorted_lines(filename):
+                            out.write(line)
+                            count += 1
+                    # mkstemp creates the file 0600; keep the mode of the file
+                    # being replaced, or give a new one the usual umask default
+                    if os.path.exists(output):
+                        shutil.copymode(output, tmp)
+                    else:
+                        umask = os.umask(0)
+                        os.umask(umask)
+                        os.chmod(tmp, 0o666 & ~umask)
+                    os.replace(tmp, output)
+                except BaseException:
+                    os.remove(tmp)
+                    raise
+                return f"Sorted {count} lines into {output}"
+            return cap_lines(sorted_lines(filename))
         except Exception as e:
             return f"Error: {e}"
 
@@ -416,10 +445,8 @@ class HybridOS:
                 return "Usage: grep <pattern> <filename>"
             pattern = parts[0]
             filename = self._normalize_path(parts[1])
-            with open(filename, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = f.readlines()
-                matching = [line for line in lines if pattern in line]
-                return ''.join(matching) if matching else f"No matches found for '{pattern}'"
+            matching = cap_lines(grep_lines(filename, pattern))
+            return matching if matching else f"No matches found for '{pattern}'"
         except Exception as e:
             return f"Error: {e}"
 
@@ -446,21 +473,20 @@ class HybridOS:
 
     def uname(self, args=""):
         try:
-            if platform.system() == "Windows":
-                result = subprocess.run("systeminfo", shell=True, capture_output=True, text=True, timeout=5)
-                return result.stdout[:500]  # Limit output
-            else:
-                result = subprocess.run("uname -a", shell=True, capture_output=True, text=True)
-                return result.stdout
+            return native.uname()
         except Exception as e:
             return f"Error: {e}"
 
     def ps(self, args=""):
         try:
             if platform.system() == "Windows":
-                result = subprocess.run("tasklist", shell=True, capture_output=True, text=True)
+                result = run_command("tasklist")
             else:
-                result = subprocess.run("ps aux", shell=True, capture_output=True, text=True)
+                # Read /proc directly where it exists
+                output = native.ps()
+                if output is not None:
+                    return output[:1000]  # Limit output
+                result = run_command("ps aux")
             return result.stdout[:1000]  # Limit output
         except Exception as e:
             return f"Error: {e}"
@@ -471,19 +497,22 @@ class HybridOS:
         try:
             pid = int(args.strip())
             if platform.system() == "Windows":
-                subprocess.run(f"taskkill /PID {pid} /F", shell=True, capture_output=True)
+                run_command(f"taskkill /PID {pid} /F")
             else:
-                subprocess.run(f"kill {pid}", shell=True, capture_output=True)
+                run_command(f"kill {pid}")
             return f"Terminated process {pid}"
         except Exception as e:
             return f"Error: {e}"
 
     def df(self, args=""):
         try:
+            output = native.df()
+            if output is not None:
+                return output
             if platform.system() == "Windows":
-                result = subprocess.run("wmic logicaldisk get size,freespace,caption", shell=True, capture_output=True, text=True)
+                result = run_command("wmic logicaldisk get size,freespace,caption")
             else:
-                result = subprocess.run("df -h", shell=True, capture_output=True, text=True)
+                result = run_command("df -h")
             return result.stdout
         except Exception as e:
             return f"Error: {e}"
@@ -493,12 +522,7 @@ class HybridOS:
             args = "."
         try:
             path = self._normalize_path(args)
-            if platform.system() == "Windows":
-                result = subprocess.run(f'powershell -Command "(Get-ChildItem -Path \'{path}\' -Recurse -ErrorAction SilentlyContinue | Measure-Object -Property Length -Sum).Sum / 1MB"', shell=True, capture_output=True, text=True)
-                return f"Size of {path}: {result.stdout.strip()} MB"
-            else:
-                result = subprocess.run(f"du -sh {path}", shell=True, capture_output=True, text=True)
-                return result.stdout
+            return native.du(path)
         except Exception as e:
             return f"Error: {e}"
 
@@ -538,9 +562,9 @@ class HybridOS:
             return "Usage: ping <hostname_or_ip>"
         try:
             if platform.system() == "Windows":
-                result = subprocess.run(f"ping -n 4 {args.strip()}", shell=True, capture_output=True, text=True, timeout=10)
+                result = run_command(f"ping -n 4 {args.strip()}", timeout=10)
             else:
-                result = subprocess.run(f"ping -c 4 {args.strip()}", shell=True, capture_output=True, text=True, timeout=10)
+                result = run_command(f"ping -c 4 {args.strip()}", timeout=10)
             return result.stdout
         except Exception as e:
             return f"Error: {e}"
@@ -548,9 +572,9 @@ class HybridOS:
     def ipconfig(self, args=""):
         try:
             if platform.system() == "Windows":
-                result = subprocess.run("ipconfig", shell=True, capture_output=True, text=True)
+                result = run_command("ipconfig")
             else:
-                result = subprocess.run("ifconfig", shell=True, capture_output=True, text=True)
+                result = run_command("ifconfig")
             return result.stdout
         except Exception as e:
             return f"Error: {e}"
@@ -558,9 +582,9 @@ class HybridOS:
     def netstat(self, args=""):
         try:
             if platform.system() == "Windows":
-                result = subprocess.run("netstat -an", shell=True, capture_output=True, text=True)
+                result = run_command("netstat -an")
             else:
-                result = subprocess.run("netstat -an", shell=True, capture_output=True, text=True)
+                result = run_command("netstat -an")
             return result.stdout[:1000]  # Limit output
         except Exception as e:
             return f"Error: {e}"
@@ -570,21 +594,14 @@ class HybridOS:
         if not args:
             return "Usage: which <command>"
         try:
-            if platform.system() == "Windows":
-                result = subprocess.run(f"where {args.strip()}", shell=True, capture_output=True, text=True)
-            else:
-                result = subprocess.run(f"which {args.strip()}", shell=True, capture_output=True, text=True)
-            return result.stdout if result.stdout else f"Command '{args.strip()}' not found"
+            output = native.which(args.strip())
+            return output if output else f"Command '{args.strip()}' not found"
         except Exception as e:
             return f"Error: {e}"
 
     def env(self, args=""):
         try:
-            if platform.system() == "Windows":
-                result = subprocess.run("set", shell=True, capture_output=True, text=True)
-            else:
-                result = subprocess.run("env", shell=True, capture_output=True, text=True)
-            return result.stdout[:1000]  # Limit output
+            return native.env()[:1000]  # Limit output
         except Exception as e:
             return f"Error: {e}"
 
@@ -604,12 +621,7 @@ class HybridOS:
 
     def ver(self, args=""):
         try:
-            if platform.system() == "Windows":
-                result = subprocess.run("ver", shell=True, capture_output=True, text=True)
-                return result.stdout.strip()
-            else:
-                result = subprocess.run("uname -r", shell=True, capture_output=True, text=True)
-                return f"Kernel version: {result.stdout.strip()}"
+            return native.ver()
         except Exception as e:
             return f"Error: {e}"
 
@@ -0,0 +1,138 @@
+# hybridos_exec.py
+import atexit
+import os
+import re
+import select
+import shlex
+import signal
+import subprocess
+import threading
+import time
+import uuid
+
+READ_SIZE = 65536
+
+class ShellWorker:
+    """A long-lived /bin/sh that runs commands sent over its stdin.
+
+    Each command is followed by a sentinel line on stdout and stderr, so its
+    output can be split off without starting a new shell every time.
+    """
+
+    def __init__(self, shell="/bin/sh"):
+        self.shell = shell
+        self.proc = None
+        self._lock = threading.Lock()
+
+    def _start(self):
+        # Its own session, so a timed-out command can be killed with the shell
+        self.proc = subprocess.Popen(
+            [self.shell], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE, start_new_session=True,
+        )
+        token = uuid.uuid4().hex
+        self._out_marker = re.compile(rb"__HYBRIDOS_" + token.encode() + rb"_(\d+)__\n")
+        self._err_marker = ("__HYBRIDOS_" + token + "__\n").encode()
+        self._script = (
+            "cd -- {cwd} && ( eval {cmd} ) </dev/null; "
+            "printf '__HYBRIDOS_" + token + "_%d__\\n' $?; "
+            "printf '__HYBRIDOS_" + token + "__\\n' >&2\n"
+        )
+
+    def stop(self):
+        if self.proc is None:
+            return
+        try:
+            os.killpg(self.proc.pid, signal.SIGKILL)
+        except OSError:
+            pass
+        self.proc.wait()
+        for pipe in (self.proc.stdin, self.proc.stdout, self.proc.stderr):
+            pipe.close()
+        self.proc = None
+
+    def run(self, cmd, timeout=None):
+        with self._lock:
+            if self.proc is None or self.proc.poll() is not None:
+                self.stop()
+                self._start()
+            # eval inside a subshell keeps syntax errors, 'exit' and 'cd' in
+            # the command from affecting the worker itself
+            script = self._script.format(cwd=shlex.quote(os.getcwd()), cmd=shlex.quote(cmd))
+            try:
+                self.proc.stdin.write(script.encode())
+                self.proc.stdin.flush()
+            except OSError:
+                # The command never reached the shell, so it is safe to retry
+                self.stop()
+                raise
+            try:
+                out, err, returncode = self._collect(timeout)
+            except subprocess.TimeoutExpired:
+                self.stop()
+                raise subprocess.TimeoutExpired(cmd, timeout)
+            if returncode is None:
+                # The worker died while the command ran. It may already have
+                # had side effects, so return what it printed instead of
+                # letting the caller run it again
+                returncode = self.proc.wait()
+                self.stop()
+        return subprocess.CompletedProcess(
+            cmd, returncode,
+            out.decode("utf-8", errors="replace"), err.decode("utf-8", errors="replace"),
+        )
+
+    def _collect(self, timeout):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        out_fd = self.proc.stdout.fileno()
+        err_fd = self.proc.stderr.fileno()
+        out, err = bytearray(), bytearray()
+        returncode = None
+        pending = {out_fd, err_fd}
+        while pending:
+            remaining = None
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise subprocess.TimeoutExpired("", timeout)
+            ready, _, _ = select.select(list(pending), [], [], remaining)
+            for fd in ready:
+                chunk = os.read(fd, READ_SIZE)
+                if not chunk:
+                    # The shell exited before printing its sentinels
+                    return bytes(out), bytes(err), None
+                if fd == out_fd:
+                    # Only the tail can hold a sentinel that was not there before
+                    start = max(0, len(out) - 64)
+                    out += chunk
+                    match = self._out_marker.search(out, start)
+                    if match:
+                        returncode = int(match.group(1))
+                        del out[match.start():]
+                        pending.discard(out_fd)
+                else:
+                    start = max(0, len(err) - len(self._err_marker))
+                    err += chunk
+                    index = err.find(self._err_marker, start)
+                    if index != -1:
+                        del err[index:]
+                        pending.discard(err_fd)
+        return bytes(out), bytes(err), returncode
+
+_worker = ShellWorker() if os.name == "posix" and os.path.exists("/bin/sh") else None
+if _worker is not None:
+    atexit.register(_worker.stop)
+
+def run_command(cmd, timeout=None):
+    """Run a shell command line and return a subprocess.CompletedProcess.
+
+    Uses the shared shell worker where one is available and falls back to
+    a one-shot subprocess.run(shell=True) on Windows or if the worker could
+    not be started or sent the command. A command is never run twice.
+    """
+    if _worker is not None:
+        try:
+            return _worker.run(cmd, timeout)
+        except OSError:
+            pass
+    return subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=timeout)
@@ -0,0 +1,320 @@
+# hybridos_native.py
+# In-process versions of commands HybridOS used to shell out for. Each
+# function returns the command's output, or None when it does not support
+# the arguments or platform so the caller can fall back to the real tool.
+import datetime
+import math
+import os
+import platform
+import shutil
+import stat
+import time
+from functools import lru_cache
+
+from hybridos_utils import system_info
+
+try:
+    import pwd
+    import grp
+except ImportError:  # Windows
+    pwd = grp = None
+
+SIX_MONTHS = 182 * 24 * 3600
+# Arguments holding any of these need the shell to expand or interpret them
+# (globs, ~, variables, quoting, redirection), so they are left to the real tool
+SHELL_SPECIAL = set("*?[]{}~$'\"`\\;|&<>()")
+
+def human_size(n):
+    """Format a byte count the way ls -h, df -h and du -h do (1024-based, rounded up)."""
+    if n < 1024:
+        return str(n)
+    for unit in "KMGTPE":
+        n /= 1024
+        if n < 10 and math.ceil(n * 10) < 100:
+            return f"{math.ceil(n * 10) / 10:.1f}{unit}"
+        if math.ceil(n) < 1024 or unit == "E":
+            return f"{math.ceil(n)}{unit}"
+
+@lru_cache(maxsize=None)
+def _user_name(uid):
+    try:
+        return pwd.getpwuid(uid).pw_name
+    except (KeyError, AttributeError):
+        return str(uid)
+
+@lru_cache(maxsize=None)
+def _group_name(gid):
+    try:
+        return grp.getgrgid(gid).gr_name
+    except (KeyError, AttributeError):
+        return str(gid)
+
+# ---- ls ----
+def _ls_time(mtime, now):
+    # Like GNU ls: clock time for recent files, the year for older ones
+    t = datetime.datetime.fromtimestamp(mtime)
+    day = f"{t.strftime('%b')} {t.day:>2}"
+    if abs(now - mtime) < SIX_MONTHS:
+        return f"{day} {t.strftime('%H:%M')}"
+    return f"{day}  {t.year}"
+
+def _ls_long(entries, human):
+    # entries: (name, lstat result, full path)
+    now = time.time()
+    rows = []
+    for name, st, path in entries:
+        if stat.S_ISLNK(st.st_mode):
+            try:
+                name = f"{name} -> {os.readlink(path)}"
+            except OSError:
+                pass
+        size = human_size(st.st_size) if human else str(st.st_size)
+        rows.append((stat.filemode(st.st_mode), str(st.st_nlink), _user_name(st.st_uid),
+                     _group_name(st.st_gid), size, _ls_time(st.st_mtime, now), name))
+    if not rows:
+        return ""
+    widths = [max(len(row[i]) for row in rows) for i in range(5)]
+    return "\n".join(
+        f"{mode} {nlink:>{widths[1]}} {user:<{widths[2]}} {group:<{widths[3]}} {size:>{widths[4]}} {mtime} {name}"
+        for mode, nlink, user, group, size, mtime, name in rows
+    )
+
+def ls(args):
+    """Native ls for -l, -a, -h and -1 with at most one literal path; POSIX only."""
+    if os.name != "posix":
+        return None
+    if SHELL_SPECIAL & set(args):
+        return None
+    flags = set()
+    paths = []
+    for token in args.split():
+        if token.startswith("-") and len(token) > 1:
+            flags.update(token[1:])
+        else:
+            paths.append(token)
+    if not flags <= set("lah1") or len(paths) > 1:
+        return None
+    path = paths[0] if paths else "."
+    long_format = "l" in flags
+
+    try:
+        st = os.lstat(path)
+    except FileNotFoundError:
+        return f"ls: cannot access '{path}': No such file or directory\n"
+    except PermissionError:
+        return f"ls: cannot access '{path}': Permission denied\n"
+    try:
+        is_dir = stat.S_ISDIR(os.stat(path).st_mode)
+    except OSError:
+        # A dangling symlink is listed, not followed
+        is_dir = False
+    if not is_dir:
+        return (_ls_long([(path, st, path)], "h" in flags) if long_format else path) + "\n"
+
+    entries = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.name.startswith(".") and "a" not in flags:
+                    continue
+                entries.append((entry.name, entry.stat(follow_symlinks=False) if long_format else None, entry.path))
+    except PermissionError:
+        return f"ls: cannot open directory '{path}': Permission denied\n"
+    if "a" in flags:
+        for name in (".", ".."):
+            full = os.path.join(path, name)
+            entries.append((name, os.lstat(full) if long_format else None, full))
+    entries.sort(key=lambda e: e[0])
+
+    if not long_format:
+        return "".join(name + "\n" for name, _, _ in entries)
+    # st_blocks counts 512-byte units; ls reports 1K blocks
+    total = sum(getattr(st, "st_blocks", 0) for _, st, _ in entries) // 2
+    total = human_size(total * 1024) if "h" in flags else str(total)
+    return f"total {total}\n" + _ls_long(entries, "h" in flags) + "\n"
+
+# ---- du ----
+def disk_usage(path):
+    """Bytes used under path, counting hard links once and not following symlinks."""
+    total = 0
+    seen = set()
+    stack = [path]
+    while stack:
+        current = stack.pop()
+        try:
+            st = os.lstat(current)
+        except OSError:
+            continue
+        if st.st_nlink > 1:
+            key = (st.st_dev, st.st_ino)
+            if key in seen:
+                continue
+            seen.add(key)
+        # Allocated blocks where the platform reports them, as du does
+        blocks = getattr(st, "st_blocks", None)
+        total += blocks * 512 if blocks is not None else st.st_size
+        if stat.S_ISDIR(st.st_mode):
+            try:
+                with os.scandir(current) as it:
+                    stack.extend(entry.path for entry in it)
+            except OSError:
+                pass
+    return total
+
+def du(path):
+    if not os.path.exists(path):
+        return f"du: cannot access '{path}': No such file or directory\n"
+    size = disk_usage(path)
+    if platform.system() == "Windows":
+        return f"Size of {path}: {size / (1 << 20):.2f} MB"
+    return f"{human_size(size)}\t{path}\n"
+
+# ---- df ----
+def _mount_points():
+    if platform.system() == "Windows":
+        return [(f"{letter}:\\", f"{letter}:\\") for letter in "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+                if os.path.exists(f"{letter}:\\")]
+    try:
+        with open("/proc/mounts") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+    mounts = []
+    for line in lines:
+        fields = line.split()
+        if len(fields) >= 2:
+            # /proc/mounts escapes spaces and tabs as octal
+            mounts.append((fields[0], fields[1].replace("\\040", " ").replace("\\011", "\t")))
+    return mounts
+
+def df():
+    mounts = _mount_points()
+    if mounts is None:
+        return None
+    rows = [("Filesystem", "Size", "Used", "Avail", "Use%", "Mounted on")]
+    seen = set()
+    for device, mount in mounts:
+        try:
+            usage = shutil.disk_usage(mount)
+        except OSError:
+            continue
+        # Like df, skip pseudo filesystems that report no blocks
+        if usage.total == 0 or mount in seen:
+            continue
+        seen.add(mount)
+        used = usage.used
+        # Like df, Use% is used / (used + available), rounded up
+        percent = math.ceil(used * 100 / (used + usage.free)) if used + usage.free else 0
+        rows.append((device, human_size(usage.total), human_size(used), human_size(usage.free),
+                     f"{percent}%", mount))
+    widths = [max(len(row[i]) for row in rows) for i in range(5)]
+    return "\n".join(
+        f"{row[0]:<{widths[0]}} {row[1]:>{widths[1]}} {row[2]:>{widths[2]}} "
+        f"{row[3]:>{widths[3]}} {row[4]:>{widths[4]}} {row[5]}"
+        for row in rows
+    ) + "\n"
+
+# ---- env, which, uname, ver ----
+def env():
+    return "".join(f"{key}={value}\n" for key, value in os.environ.items())
+
+def which(names):
+    found = [shutil.which(name) for name in names.split()]
+    return "".join(path + "\n" for path in found if path)
+
+def uname():
+    if platform.system() == "Windows":
+        return system_info()
+    u = platform.uname()
+    parts = [u.system, u.node, u.release, u.version, u.machine]
+    if u.system == "Linux":
+        parts.append("GNU/Linux")
+    return " ".join(parts) + "\n"
+
+def ver():
+    if platform.system() == "Windows":
+        return f"Microsoft Windows [Version {platform.version()}]"
+    return f"Kernel version: {platform.release()}"
+
+# ---- ps ----
+def _read_proc(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+def _tty_name(tty_nr):
+    if not tty_nr:
+        return "?"
+    major = (tty_nr >> 8) & 0xfff
+    minor = (tty_nr & 0xff) | ((tty_nr >> 12) & 0xfff00)
+    if 136 <= major <= 143:
+        return f"pts/{minor + (major - 136) * 256}"
+    if major == 4:
+        return f"tty{minor}"
+    return "?"
+
+def ps():
+    """ps aux built from /proc; None where /proc is not available."""
+    if not os.path.isdir("/proc/self"):
+        return None
+    clock_ticks = os.sysconf("SC_CLK_TCK")
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    uptime = float(_read_proc("/proc/uptime").split()[0])
+    boot_time = time.time() - uptime
+    mem_total = 0
+    for line in _read_proc("/proc/meminfo").splitlines():
+        if line.startswith(b"MemTotal:"):
+            mem_total = int(line.split()[1]) * 1024
+            break
+    today = datetime.date.today()
+
+    rows = []
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            raw = _read_proc(f"/proc/{name}/stat")
+            cmdline = _read_proc(f"/proc/{name}/cmdline")
+            uid = os.stat(f"/proc/{name}").st_uid
+        except OSError:
+            # The process exited while we were reading it
+            continue
+        # comm may contain spaces and parentheses, so split after the last ')'
+        comm = raw[raw.index(b"(") + 1:raw.rindex(b")")].decode(errors="replace")
+        fields = raw[raw.rindex(b")") + 2:].split()
+        state = fields[0].decode()
+        pgrp, session, tty_nr, tpgid = int(fields[2]), int(fields[3]), int(fields[4]), int(fields[5])
+        utime, stime = int(fields[11]), int(fields[12])
+        nice, threads = int(fields[16]), int(fields[17])
+        start_ticks, vsize, rss_pages = int(fields[19]), int(fields[20]), int(fields[21])
+
+        pid = int(name)
+        cpu_seconds = (utime + stime) / clock_ticks
+        elapsed = uptime - start_ticks / clock_ticks
+        rss = rss_pages * page_size
+        status = state
+        if nice < 0:
+            status += "<"
+        elif nice > 0:
+            status += "N"
+        if pid == session:
+            status += "s"
+        if threads > 1:
+            status += "l"
+        if tpgid == pgrp and tty_nr:
+            status += "+"
+        started = datetime.datetime.fromtimestamp(boot_time + start_ticks / clock_ticks)
+        start = started.strftime("%H:%M") if started.date() == today else started.strftime("%b%d")
+        command = cmdline.replace(b"\0", b" ").decode(errors="replace").strip() or f"[{comm}]"
+        rows.append((
+            _user_name(uid), pid,
+            cpu_seconds * 100 / elapsed if elapsed > 0 else 0.0,
+            rss * 100 / mem_total if mem_total else 0.0,
+            vsize // 1024, rss // 1024, _tty_name(tty_nr), status, start,
+            f"{int(cpu_seconds // 60)}:{int(cpu_seconds % 60):02d}", command,
+        ))
+    rows.sort(key=lambda row: row[1])
+    lines = ["USER         PID %CPU %MEM    VSZ   RSS TTY      STAT START   TIME COMMAND"]
+    for user, pid, cpu, mem, vsz, rss, tty, status, start, cputime, command in rows:
+        lines.append(f"{user[:8]:<8} {pid:>7} {cpu:>4.1f} {mem:>4.1f} {vsz:>6} {rss:>5} "
+                     f"{tty:<8} {status:<4} {start:>5} {cputime:>6} {command}")
+    return "\n".join(lines) + "\n"
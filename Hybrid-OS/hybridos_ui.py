@@ -1,6 +1,7 @@
 # hybridos_gui_unified.py
 import tkinter as tk
 from hybridos_core import HybridOS
+from hybridos_exec import run_command
 import subprocess
 import os
 from tkinter import filedialog
@@ -324,7 +325,7 @@ class HybridGUI:
         
         # Try Windows command first
         try:
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=30)
+            result = run_command(cmd, timeout=30)
             output = result.stdout + result.stderr
             
             # If command failed and WSL is available, try WSL
@@ -1,6 +1,9 @@
 import os
 import platform
 import getpass
+import heapq
+import itertools
+import tempfile
 
 def list_files(directory):
     try:
@@ -23,3 +26,125 @@ def system_info():
         "User": getpass.getuser()
     }
     return "\n".join([f"{key}: {value}" for key, value in info.items()])
+
+# ---- Streaming text helpers ----
+# These read files incrementally so memory stays bounded however large the
+# file is; outputs that could be as large as the file are capped.
+READ_BLOCK_SIZE = 1 << 16
+MAX_OUTPUT_CHARS = 1 << 20
+SORT_CHUNK_BYTES = 32 << 20
+# UTF-8 continuation bytes; every other byte starts a character
+_CONTINUATION_BYTES = bytes(range(0x80, 0xC0))
+
+def _open_text(path):
+    return open(path, 'r', encoding='utf-8', errors='ignore')
+
+def cap_lines(lines, limit=MAX_OUTPUT_CHARS):
+    # Join lines until the output limit, then only count the rest, so the
+    # output is always a prefix of the full result
+    parts = []
+    size = 0
+    skipped = 0
+    for line in lines:
+        if skipped or size + len(line) > limit:
+            skipped += 1
+            continue
+        parts.append(line)
+        size += len(line)
+    if skipped:
+        parts.append(f"\n... {skipped} more lines not shown (output limited to {limit} characters)\n")
+    return ''.join(parts)
+
+def head_lines(path, n=10):
+    with _open_text(path) as f:
+        return ''.join(itertools.islice(f, n))
+
+def tail_lines(path, n=10, block_size=READ_BLOCK_SIZE):
+    # Read backwards from the end in blocks until n line breaks are found
+    if n <= 0:
+        return ""
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        blocks = []
+        newlines = 0
+        while pos > 0 and newlines <= n:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            block = f.read(step)
+            blocks.append(block)
+            newlines += block.count(b'\n')
+    data = b''.join(reversed(blocks))
+    lines = data.splitlines(keepends=True)
+    return b''.join(lines[-n:]).decode('utf-8', errors='ignore')
+
+def count_file(path, block_size=READ_BLOCK_SIZE):
+    """Return (lines, words, characters) for a UTF-8 file, read in binary blocks."""
+    lines = words = chars = 0
+    in_word = False
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            lines += block.count(b'\n')
+            chars += len(block.translate(None, _CONTINUATION_BYTES))
+            words += len(block.split())
+            # A word split across two blocks was counted in both
+            if in_word and not block[:1].isspace():
+                words -= 1
+            in_word = not block[-1:].isspace()
+    return lines, words, chars
+
+def read_capped(path, limit=MAX_OUTPUT_CHARS):
+    with _open_text(path) as f:
+        data = f.read(limit)
+        if f.read(1):
+            size = os.path.getsize(path)
+            data += f"\n... output truncated at {limit} characters (file is {size} bytes); use head or tail\n"
+    return data
+
+def grep_lines(path, pattern):
+    with _open_text(path) as f:
+        for line in f:
+            if pattern in line:
+                yield line
+
+def _spill(lines):
+    spill = tempfile.TemporaryFile('w+', encoding='utf-8')
+    spill.writelines(sorted(lines))
+    spill.seek(0)
+    return spill
+
+def sorted_lines(path, chunk_bytes=SORT_CHUNK_BYTES):
+    """Yield the file's lines in sorted order using an external merge sort.
+
+    Runs of up to chunk_bytes are sorted in memory and spilled to temporary
+    files, which are then merged lazily with heapq.merge.
+    """
+    spills = []
+    try:
+        with _open_text(path) as f:
+            chunk = []
+            size = 0
+            for line in f:
+                if not line.endswith('\n'):
+                    line += '\n'
+                chunk.append(line)
+                size += len(line)
+                if size >= chunk_bytes:
+                    spills.append(_spill(chunk))
+                    chunk = []
+                    size = 0
+        if not spills:
+            # Small enough to sort in memory
+            yield from sorted(chunk)
+            return
+        if chunk:
+            spills.append(_spill(chunk))
+        del chunk
+        yield from heapq.merge(*spills)
+    finally:
+        for spill in spills:
+            spill.close()